@@ -0,0 +1,115 @@
+import numpy as np
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+# UTC hour ranges [start, end)
+SESSIONS = (("asia",0,7), ("london",7,13), ("newyork",13,21), ("late",21,24))
+WEEKDAYS = ("Mon","Tue","Wed","Thu","Fri","Sat","Sun")
+
+def _mat(a)->np.ndarray:
+    """1-D run or 2-D (runs x trades) matrix, NaN-padded on the right."""
+    a=np.asarray(a, dtype=float)
+    return a[None,:] if a.ndim==1 else a
+
+def _out(d:Dict[str,np.ndarray], single:bool)->Dict[str,Any]:
+    return {k:(float(v[0]) if single else v) for k,v in d.items()}
+
+def to_datetime64(times)->np.ndarray:
+    """ISO strings ('2024-01-02T03:04:05[.fff][Z]') / datetimes -> datetime64[s]; None/'' -> NaT."""
+    t=np.asarray(times, dtype=object)
+    flat=[(str(x)[:19] if x not in (None,"") and x==x else "NaT") for x in t.ravel()]
+    return np.array(flat, dtype="datetime64[s]").reshape(t.shape)
+
+def max_drawdown(R)->np.ndarray:
+    """Max drawdown of cumulative R per run (<=0), measured from the running peak of cum R."""
+    cum=np.cumsum(np.nan_to_num(_mat(R)), axis=1)
+    if cum.shape[1]==0: return np.zeros(cum.shape[0])
+    return (cum-np.maximum.accumulate(cum, axis=1)).min(axis=1)
+
+def trade_stats(R, years:Optional[float]=None, exposure=None)->Dict[str,Any]:
+    """
+    Per-run trade statistics from R multiples. `R` is one run (1-D) or a sweep
+    matrix (runs x trades, NaN padding); results are floats or arrays of len(runs).
+    Sharpe/Sortino are per trade, annualised by trades/year when `years` is given.
+    """
+    single=np.ndim(R)==1; M=_mat(R); ok=~np.isnan(M); Z=np.where(ok, M, 0.0)
+    n=ok.sum(axis=1); nn=np.maximum(n, 1)
+    wins=(Z>0).sum(axis=1); gross_w=np.where(Z>0, Z, 0).sum(axis=1); gross_l=-np.where(Z<0, Z, 0).sum(axis=1)
+    total=Z.sum(axis=1); mean=total/nn
+    var=np.where(ok, (M-mean[:,None])**2, 0).sum(axis=1)/np.maximum(n-1, 1)
+    down=np.sqrt(np.where(ok, np.minimum(M, 0)**2, 0).sum(axis=1)/nn)
+    dd=max_drawdown(M)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ann=np.sqrt(n/years) if years else 1.0
+        sharpe=np.where(var>0, mean/np.sqrt(var), np.nan)*ann
+        sortino=np.where(down>0, mean/down, np.nan)*ann
+        pf=np.where(gross_l>0, gross_w/gross_l, np.where(gross_w>0, np.inf, np.nan))
+        mar=np.where(dd<0, (total/(years or 1.0))/-dd, np.nan)
+    out={"trades":n.astype(float), "win_rate":100.0*wins/nn, "avg_R":mean, "expectancy":mean,
+         "total_R":total, "maxDD_R":dd, "profit_factor":pf, "sharpe":sharpe, "sortino":sortino, "MAR":mar}
+    if exposure is not None: out["exposure"]=np.broadcast_to(np.asarray(exposure, dtype=float), n.shape)
+    return _out(out, single)
+
+def equity_stats(equity, periods_per_year:float=252.0)->Dict[str,Any]:
+    """Sharpe, Sortino, CAGR, max drawdown (fraction) and MAR from equity curves (1-D or runs x bars)."""
+    single=np.ndim(equity)==1; E=_mat(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r=E[:,1:]/E[:,:-1]-1.0
+        mu=np.nanmean(r, axis=1); sd=np.nanstd(r, axis=1, ddof=1)
+        down=np.sqrt(np.nanmean(np.minimum(r, 0)**2, axis=1))
+        peak=np.fmax.accumulate(E, axis=1); dd=np.nanmin(E/peak-1.0, axis=1)
+        last=np.array([row[~np.isnan(row)][-1] if (~np.isnan(row)).any() else np.nan for row in E])
+        periods=(~np.isnan(r)).sum(axis=1)
+        cagr=(last/E[:,0])**(periods_per_year/np.maximum(periods, 1))-1.0
+        out={"sharpe":mu/sd*np.sqrt(periods_per_year), "sortino":mu/down*np.sqrt(periods_per_year),
+             "cagr":cagr, "maxDD":dd, "MAR":np.where(dd<0, cagr/-dd, np.nan)}
+    return _out(out, single)
+
+def _codes(t:np.ndarray, by:str)->Tuple[np.ndarray, Sequence[str]]:
+    nat=np.isnat(t); ts=np.where(nat, np.datetime64(0, "s"), t)
+    if by=="month":
+        m=ts.astype("datetime64[M]").astype(np.int64)
+        uniq, inv=np.unique(m[~nat], return_inverse=True)
+        codes=np.full(t.shape, -1, dtype=np.int64); codes[~nat]=inv
+        return codes, [str(np.datetime64(int(u), "M")) for u in uniq]
+    if by=="weekday":
+        codes=(ts.astype("datetime64[D]").astype(np.int64)+3)%7  # 1970-01-01 was a Thursday
+        return np.where(nat, -1, codes), WEEKDAYS
+    if by=="session":
+        hour=(ts.astype("datetime64[h]").astype(np.int64))%24
+        codes=np.full(t.shape, -1, dtype=np.int64)
+        for i,(_,a,b) in enumerate(SESSIONS): codes[(hour>=a)&(hour<b)]=i
+        return np.where(nat, -1, codes), [s[0] for s in SESSIONS]
+    raise ValueError(f"unknown breakdown {by!r} (month|weekday|session)")
+
+def breakdown(R, times, by:str="month")->Tuple[Sequence[str], np.ndarray, np.ndarray]:
+    """
+    Bucket trade R by exit time. Returns (labels, total_R, counts), the matrices
+    being (runs x len(labels)); month labels are the union of months across runs.
+    """
+    M=_mat(R); t=to_datetime64(times); t=t[None,:] if t.ndim==1 else t
+    codes, labels=_codes(t, by); use=(codes>=0)&~np.isnan(M)
+    rows=np.broadcast_to(np.arange(M.shape[0])[:,None], M.shape)[use]
+    tot=np.zeros((M.shape[0], len(labels))); cnt=np.zeros_like(tot)
+    np.add.at(tot, (rows, codes[use]), M[use]); np.add.at(cnt, (rows, codes[use]), 1)
+    return labels, tot, cnt
+
+def breakdowns(R, times)->Dict[str,Dict[str,Dict[str,float]]]:
+    """Single-run month/weekday/session tables: {by: {label: {"trades":n, "total_R":x}}}."""
+    out={}
+    for by in ("month","weekday","session"):
+        labels, tot, cnt=breakdown(R, times, by)
+        out[by]={l:{"trades":int(cnt[0,i]), "total_R":round(float(tot[0,i]),2)} for i,l in enumerate(labels) if cnt[0,i]}
+    return out
+
+def rank(stats:Dict[str,np.ndarray], by:str="sharpe", top:Optional[int]=None)->np.ndarray:
+    """Run indices of a sweep ordered best-first on `by` (NaN last)."""
+    v=np.asarray(stats[by], dtype=float)
+    nan=np.isnan(v); order=np.lexsort((np.where(nan, 0.0, -v), nan))  # NaN after every finite/inf value; stable
+    return order[:top] if top else order
+
+def pad(runs:Sequence[Sequence[float]], fill=np.nan)->np.ndarray:
+    """Stack ragged per-run lists (R, or exit times with fill=None) into a padded (runs x max_trades) matrix."""
+    width=max((len(r) for r in runs), default=0)
+    M=np.full((len(runs), width), fill, dtype=object if fill is None else float)
+    for i,r in enumerate(runs): M[i,:len(r)]=r
+    return M
@@ -1,6 +1,6 @@
 import os, random, json, math, time
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
 def now_ms(): return int(time.time()*1000)
 
@@ -60,6 +60,9 @@ class Oanda:  # masquerades as unibot.adapters.oanda.Oanda
         net = self._state["positions"].get(symbol,0)
         return {"symbol":symbol,"netUnits":net}
 
+    def open_positions(self)->List[Dict[str,Any]]:
+        return [{"symbol":s,"netUnits":n} for s,n in self._state["positions"].items() if n]
+
     def consolidate(self, symbol:str)->Dict[str,Any]:
         # single-net position simulation
         return {"status":"ok","symbol":symbol,"net":self._state["positions"].get(symbol,0)}
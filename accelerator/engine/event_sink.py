@@ -0,0 +1,104 @@
+import json, gzip, pathlib
+from collections import Counter
+from typing import Dict, Any, Optional, Iterator
+
+# optional fast paths: orjson for encoding, zstandard for compression
+try:
+    import orjson
+    def _dumps(e:Dict[str,Any])->bytes:
+        return orjson.dumps(e, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    _loads = orjson.loads
+except Exception:
+    orjson = None
+    def _dumps(e:Dict[str,Any])->bytes:
+        return json.dumps(e, separators=(",",":"), default=_default).encode()
+    _loads = json.loads
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+def _default(o):
+    # numpy / pandas scalars and timestamps
+    if hasattr(o, "item"): return o.item()
+    return str(o)
+
+SUFFIX = {None:"", "gzip":".gz", "zstd":".zst"}
+
+def _compressor(kind:Optional[str], level:int):
+    if kind is None: return lambda b: b
+    if kind=="gzip": return lambda b: gzip.compress(b, compresslevel=level)
+    if kind=="zstd":
+        if zstandard is None: raise RuntimeError("events_compress=zstd needs the 'zstandard' package")
+        c = zstandard.ZstdCompressor(level=level); return c.compress
+    raise ValueError(f"unknown compression {kind!r} (use gzip|zstd|None)")
+
+def _decompressor(kind:Optional[str]):
+    if kind is None: return lambda b: b
+    if kind=="gzip": return gzip.decompress
+    if kind=="zstd":
+        if zstandard is None: raise RuntimeError("reading zstd events needs the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"unknown compression {kind!r}")
+
+class EventSink:
+    """
+    Incremental JSONL event writer. Events are buffered and flushed every `batch`
+    events; each flush writes one block per symbol (one gzip member / zstd frame
+    when compressed), and `<file>.idx.json` records [offset, length, count] of
+    every block per symbol so readers can seek straight to one symbol's events.
+    """
+    def __init__(self, path, compress:Optional[str]=None, batch:int=4096, key:str="sym", level:int=3):
+        compress = None if compress in (None, "", "none") else compress
+        self._z=_compressor(compress, level)
+        self.path = pathlib.Path(str(path)+SUFFIX[compress])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compress=compress; self.batch=max(1,int(batch)); self.key=key
+        self._f=open(self.path, "wb"); self._off=0
+        self._buf:Dict[str,list]={}; self._pending=0
+        self.index:Dict[str,list]={}; self.count=0; self.types=Counter()
+
+    def write(self, e:Dict[str,Any])->None:
+        self._buf.setdefault(str(e.get(self.key,"_")), []).append(_dumps(e))
+        self.count+=1; self.types[e.get("t")]+=1; self._pending+=1
+        if self._pending>=self.batch: self.flush()
+
+    def flush(self)->None:
+        if not self._pending: return
+        for sym, lines in self._buf.items():
+            blob=self._z(b"\n".join(lines)+b"\n")
+            self._f.write(blob)
+            self.index.setdefault(sym, []).append([self._off, len(blob), len(lines)])
+            self._off+=len(blob)
+        self._f.flush(); self._buf={}; self._pending=0
+
+    def close(self)->None:
+        if self._f.closed: return
+        self.flush(); self._f.close()
+        idx={"compress":self.compress, "key":self.key, "events":self.count, "symbols":self.index}
+        pathlib.Path(str(self.path)+".idx.json").write_text(json.dumps(idx))
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+class CountingSink:
+    """EventSink stand-in that keeps only count/types (runs without a report write nothing)."""
+    path=None
+    def __init__(self): self.count=0; self.types=Counter()
+    def write(self, e:Dict[str,Any])->None: self.count+=1; self.types[e.get("t")]+=1
+    def flush(self)->None: pass
+    def close(self)->None: pass
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+def read_events(path, symbol:Optional[str]=None)->Iterator[Dict[str,Any]]:
+    """Yield events from an EventSink file; with `symbol`, only that symbol's blocks are read."""
+    path=pathlib.Path(path); idx=json.loads(pathlib.Path(str(path)+".idx.json").read_text())
+    unz=_decompressor(idx["compress"])
+    if symbol is None: blocks=sorted(b for v in idx["symbols"].values() for b in v)
+    else: blocks=idx["symbols"].get(str(symbol), [])
+    with open(path, "rb") as f:
+        for off, n, _ in blocks:
+            f.seek(off)
+            for line in unz(f.read(n)).splitlines():
+                if line: yield _loads(line)
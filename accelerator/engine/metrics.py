@@ -1,12 +1,21 @@
 import json, pathlib, pandas as pd
+from accelerator.engine.event_sink import EventSink
 REP=pathlib.Path(__file__).resolve().parents[1]/"reports"; REP.mkdir(parents=True, exist_ok=True)
 
-def write_report(meta:dict, strat_summary:pd.DataFrame, sys_summary:pd.DataFrame, trade_rows:list, events:list):
+def open_event_sink(compress=None, batch:int=4096, path=None)->EventSink:
+    """Streaming writer for reports/events.jsonl[.gz|.zst] (+ .idx.json per-symbol index)."""
+    return EventSink(path or REP/"events.jsonl", compress=compress, batch=batch)
+
+def write_report(meta:dict, strat_summary:pd.DataFrame, sys_summary:pd.DataFrame, trade_rows:list, events:list=None, breakdowns:dict=None):
     (REP/"strat_metrics.json").write_text(strat_summary.to_json(orient="records",indent=2))
     (REP/"sys_metrics.json").write_text(sys_summary.to_json(orient="records",indent=2))
     if trade_rows:
         pd.DataFrame(trade_rows).to_csv(REP/"all_trades.csv", index=False)
-    (REP/"events.jsonl").write_text("\n".join([json.dumps(e) for e in events]))
+    if events is not None:  # legacy in-memory list; replay streams through open_event_sink()
+        with open_event_sink() as sink:
+            for e in events: sink.write(e)
+    if breakdowns:  # per-symbol month / weekday / session R tables (analytics.breakdowns)
+        (REP/"breakdowns.json").write_text(json.dumps(breakdowns, indent=2))
     # Quick MD
     md=[]
     md.append(f"# Accelerated Replay — Summary\n")
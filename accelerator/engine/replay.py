@@ -4,7 +4,9 @@ from tqdm import tqdm
 from accelerator.engine.monkeypatch import patch_if_needed
 from accelerator.engine.strategy_sniper_fvg import signals
 from accelerator.engine.data_fetch import ensure_data
-from accelerator.engine.metrics import write_report
+from accelerator.engine.metrics import write_report, open_event_sink
+from accelerator.engine.event_sink import CountingSink
+from accelerator.engine.analytics import trade_stats, breakdowns
 
 ROOT=pathlib.Path(__file__).resolve().parents[1]
 DATA=ROOT/"data"
@@ -21,8 +23,22 @@ def position_size(equity:float, risk_pct:float, sl_pips:float, pip:float, price:
     if notional < min_notional: units = math.ceil(min_notional/price)
     return max(1, int(units))
 
-def run():
-    cfg=yaml.safe_load(open(ROOT/"config"/"accelerated_replay.yaml"))
+def strat_row(sym:str, trades:list, years:float, bars:int, bars_in:int)->dict:
+    if not trades:
+        return {"symbol":sym,"trades":0,"win_rate":0,"avg_R":0,"total_R":0,"maxDD_R":0}
+    st=trade_stats([t["R"] for t in trades], years=years, exposure=bars_in/max(1,bars))
+    row={"symbol":sym,"trades":len(trades),"win_rate":round(st["win_rate"],1)}
+    for k in ("avg_R","total_R","maxDD_R","profit_factor","expectancy","sharpe","sortino","MAR","exposure"):
+        row[k]=round(st[k],2 if k!="exposure" else 3)
+    return row
+
+def run(cfg:dict=None, frames:dict=None, report:bool=True)->dict:
+    """
+    Full replay. `cfg` defaults to config/accelerated_replay.yaml; `frames` maps
+    symbol -> OHLC DataFrame (time,o,h,l,c) and bypasses ensure_data for those
+    symbols; report=False skips the report files (benchmarks, sweeps).
+    """
+    cfg=cfg or yaml.safe_load(open(ROOT/"config"/"accelerated_replay.yaml"))
     g=cfg["global"]; fx=cfg["fx"]; cr=cfg["crypto"]; rules=cfg["sniper_fvg"]
     years=g["years"]
 
@@ -44,8 +60,8 @@ def run():
             def __call__(self,*a,**k): return {"status":"blocked","reason":"router-missing"}
         one_shot_entry=Dummy()
 
-    events=[]; trade_rows=[]
-    strat_rows=[]; sys_rows=[]
+    events=open_event_sink(g.get("events_compress"), int(g.get("events_batch",4096))) if report else CountingSink(); trade_rows=[]
+    strat_rows=[]; sys_rows=[]; breakdown_rows={}
     total_bars=0
     equity=float(g["starting_equity"]); daily_loss_cap=float(g["daily_loss_cap_R"])
 
@@ -53,19 +69,19 @@ def run():
     # === FX ===
     for sym in fx["symbols"]:
         universes.append(sym)
-        f = ensure_data(sym, True, g["granularity_fx"], years)
-        df=pd.read_csv(f)
+        df=frames[sym] if frames and sym in frames else pd.read_csv(ensure_data(sym, True, g["granularity_fx"], years))
         total_bars+=len(df)
         pip=pip_of(sym)
         dfS=signals(df, rules, pip, is_crypto=False)
         in_pos=False; side=None; entry=None; tp=None; sl=None; cid=None; et=None
-        last_fill=None; trades=[]; day_R=0.0
-        atr=dfS["atr"].fillna(method="bfill").fillna(method="ffill")
+        last_fill=None; trades=[]; day_R=0.0; bars_in=0
+        atr=dfS["atr"].bfill().ffill()
         for i in range(30, len(dfS)):
             row=dfS.iloc[i]; ts=row["time"]; price=row["c"]; high=row["h"]; low=row["l"]
             day = ts[:10]
             if i>0 and dfS.iloc[i-1]["time"][:10]!=day: day_R=0.0
             if in_pos:
+                bars_in+=1
                 # trailing activation?
                 move = ((price-entry)/(pip*float(rules["hard_sl_pips"])) if side=="long" else ((entry-price)/(pip*float(rules["hard_sl_pips"]))))
                 if move >= g["trail_activation_R"] and cid:
@@ -114,30 +130,29 @@ def run():
                 if random.random() < g["oco_drop_rate"]:
                     pass  # we already model missing OCO by not using broker state; integrity logged below
                 et=ts; in_pos=True; last_fill=entry
-                events.append({"t":"signal_entry","sym":sym,"ts":ts,"side":side,"units":units,"entry":entry,"tp":tp,"sl":sl,"cid":cid})
+                events.write({"t":"signal_entry","sym":sym,"ts":ts,"side":side,"units":units,"entry":entry,"tp":tp,"sl":sl,"cid":cid})
         # metrics per symbol
-        tdf=pd.DataFrame(trades)
-        if len(tdf):
-            tdf["cum_R"]=tdf["R"].cumsum()
-            strat_rows.append({"symbol":sym,"trades":len(tdf),"win_rate":round(100*(tdf["R"]>0).mean(),1),"avg_R":round(float(tdf["R"].mean()),2),"total_R":round(float(tdf["R"].sum()),2),"maxDD_R":round(float((tdf['cum_R']-tdf['cum_R'].cummax()).min()),2)})
+        strat_rows.append(strat_row(sym, trades, years, len(dfS)-30, bars_in))
+        if trades:
+            breakdown_rows[sym]=breakdowns([t["R"] for t in trades], [t["exit_time"] for t in trades])
+        if trades and report:
+            tdf=pd.DataFrame(trades); tdf["cum_R"]=tdf["R"].cumsum()
             tdf.to_csv(REPORTS/f"trades_{sym.replace('/','_')}_{g['granularity_fx']}.csv",index=False)
-        else:
-            strat_rows.append({"symbol":sym,"trades":0,"win_rate":0,"avg_R":0,"total_R":0,"maxDD_R":0})
     # === CRYPTO (spot) ===
     for sym in cr["symbols_spot"]:
         universes.append(sym)
-        f = ensure_data(sym, False, g["granularity_crypto"], years, exchange_id=cr["exchange"])
-        df=pd.read_csv(f)
+        df=frames[sym] if frames and sym in frames else pd.read_csv(ensure_data(sym, False, g["granularity_crypto"], years, exchange_id=cr["exchange"]))
         total_bars+=len(df)
         # treat crypto like USD-quoted with pip=price*1e-4 approx for sizing heuristic
         pip = 0.0001  # heuristic; spread modeled as bps
         dfS=signals(df, rules, pip, is_crypto=True)
-        trades=[]; in_pos=False; side=None; entry=None; tp=None; sl=None; et=None; last_fill=None; day_R=0.0
+        trades=[]; in_pos=False; side=None; entry=None; tp=None; sl=None; et=None; last_fill=None; day_R=0.0; bars_in=0
         for i in range(30, len(dfS)):
             row=dfS.iloc[i]; ts=row["time"]; price=row["c"]; high=row["h"]; low=row["l"]
             day = ts[:10]
             if i>0 and dfS.iloc[i-1]["time"][:10]!=day: day_R=0.0
             if in_pos:
+                bars_in+=1
                 hit_tp = (high >= tp) if side=="long" else (low <= tp)
                 hit_sl = (low  <= sl) if side=="long" else (high >= sl)
                 closed=None
@@ -170,25 +185,26 @@ def run():
                 sl = entry - (sl_pips*pip if side=="long" else +sl_pips*pip)
                 units=1  # spot crypto sizing simplified to 1 unit (could add notional sizing here)
                 et=ts; in_pos=True; last_fill=entry
-                events.append({"t":"signal_entry","sym":sym,"ts":ts,"side":side,"units":units,"entry":entry,"tp":tp,"sl":sl})
-        tdf=pd.DataFrame(trades)
-        if len(tdf):
-            tdf["cum_R"]=tdf["R"].cumsum()
-            strat_rows.append({"symbol":sym,"trades":len(tdf),"win_rate":round(100*(tdf["R"]>0).mean(),1),"avg_R":round(float(tdf["R"].mean()),2),"total_R":round(float(tdf["R"].sum()),2),"maxDD_R":round(float((tdf['cum_R']-tdf['cum_R'].cummax()).min()),2)})
+                events.write({"t":"signal_entry","sym":sym,"ts":ts,"side":side,"units":units,"entry":entry,"tp":tp,"sl":sl})
+        strat_rows.append(strat_row(sym, trades, years, len(dfS)-30, bars_in))
+        if trades:
+            breakdown_rows[sym]=breakdowns([t["R"] for t in trades], [t["exit_time"] for t in trades])
+        if trades and report:
+            tdf=pd.DataFrame(trades); tdf["cum_R"]=tdf["R"].cumsum()
             tdf.to_csv(REPORTS/f"trades_{sym.replace('/','_')}_{g['granularity_crypto']}.csv",index=False)
-        else:
-            strat_rows.append({"symbol":sym,"trades":0,"win_rate":0,"avg_R":0,"total_R":0,"maxDD_R":0})
 
     # SYSTEM metrics (workflow integrity proxies in sim)
     sys_rows.append({
-        "events": len(events),
-        "signals_to_orders_ratio": round(sum(1 for e in events if e["t"]=="signal_entry") / max(1,len(events)),3),
-        "oco_drop_simulated": int(round(len(events)*float(os.getenv("SIM_OCO_DROP_RATE","0")),0)),
+        "events": events.count,
+        "signals_to_orders_ratio": round(events.types["signal_entry"] / max(1,events.count),3),
+        "oco_drop_simulated": int(round(events.count*float(os.getenv("SIM_OCO_DROP_RATE","0")),0)),
         "min_notional_usd": float(g["min_notional_usd"]),
         "trail_activation_R": float(g["trail_activation_R"]),
     })
 
     meta={"universe": f"{len(universes)} symbols (FX+Crypto)","bars": total_bars, "years": years}
-    write_report(meta, pd.DataFrame(strat_rows), pd.DataFrame(sys_rows), trade_rows=[], events=events)
+    events.close()
+    if report: write_report(meta, pd.DataFrame(strat_rows), pd.DataFrame(sys_rows), trade_rows=[], breakdowns=breakdown_rows)
+    return {"meta":meta, "strat":strat_rows, "sys":sys_rows, "breakdowns":breakdown_rows}
 
 if __name__=="__main__": run()
@@ -0,0 +1,6 @@
+"""
+Offline micro/macro benchmarks for the trading hot paths.
+
+  python -m benchmarks run [--scales 1e3,1e4,1e5] [--only atr,mark] [--out FILE]
+  python -m benchmarks compare BASE.json NEW.json [--threshold 0.10]
+"""
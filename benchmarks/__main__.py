@@ -0,0 +1,74 @@
+import os, sys, json, time, platform, argparse, subprocess, statistics
+from datetime import datetime, timezone
+from .cases import CASES
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS=os.path.join(ROOT, "benchmarks", "results")
+
+def machine():
+    import numpy, pandas
+    try: rev=subprocess.run(["git","rev-parse","--short","HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except Exception: rev=None
+    cpu=platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu=next((l.split(":",1)[1].strip() for l in f if l.startswith("model name")), cpu)
+    except OSError: pass
+    return {"host":platform.node(), "platform":platform.platform(), "python":platform.python_version(),
+            "cpu":cpu, "cpus":os.cpu_count(), "numpy":numpy.__version__, "pandas":pandas.__version__, "git":rev}
+
+def _scale(s): return int(float(s))
+
+def bench(name, n, repeat):
+    setup, cap, unit=CASES[name]
+    fn=setup(n); fn()  # warm-up: imports, caches, first-touch allocations
+    ts=[]
+    for _ in range(repeat):
+        t=time.perf_counter(); fn(); ts.append(time.perf_counter()-t)
+    best=min(ts)
+    return {"case":name, "n":n, "unit":unit, "repeat":repeat, "best_s":best, "median_s":statistics.median(ts),
+            "per_unit_us":best/n*1e6, "units_per_s":n/max(best,1e-12)}
+
+def cmd_run(a):
+    names=[k for k in CASES if not a.only or any(o in k for o in a.only.split(","))]
+    if not names: sys.exit(f"no case matches {a.only!r}; have: {', '.join(CASES)}")
+    rows=[]
+    for name in names:
+        for n in map(_scale, a.scales.split(",")):
+            if n>CASES[name][1]: continue
+            r=bench(name, n, a.repeat); rows.append(r)
+            print(f"{name:32s} n={n:>9,d}  best {r['best_s']*1e3:10.2f} ms  {r['per_unit_us']:9.3f} us/{r['unit']}", flush=True)
+    out=a.out or os.path.join(RESULTS, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")+".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f: json.dump({"machine":machine(), "results":rows}, f, indent=2)
+    print(f"-> {out}")
+
+def cmd_compare(a):
+    base, new=(json.load(open(p)) for p in (a.base, a.new))
+    old={(r["case"], r["n"]):r for r in base["results"]}
+    bad=0
+    for r in new["results"]:
+        o=old.get((r["case"], r["n"]))
+        if not o: continue
+        d=r["best_s"]/max(o["best_s"],1e-12)-1
+        flag="REGRESSION" if d>a.threshold else ("faster" if d< -a.threshold else "")
+        bad+=flag=="REGRESSION"
+        print(f"{r['case']:32s} n={r['n']:>9,d}  {o['best_s']*1e3:10.2f} -> {r['best_s']*1e3:10.2f} ms  {d*100:+7.1f}%  {flag}")
+    if base["machine"].get("cpu")!=new["machine"].get("cpu"):
+        print(f"note: different CPUs ({base['machine'].get('cpu')} vs {new['machine'].get('cpu')})")
+    sys.exit(1 if bad else 0)
+
+def main():
+    p=argparse.ArgumentParser(prog="python -m benchmarks")
+    sub=p.add_subparsers(dest="cmd", required=True)
+    r=sub.add_parser("run"); r.set_defaults(fn=cmd_run)
+    r.add_argument("--scales", default="1e3,1e4,1e5", help="comma-separated input sizes")
+    r.add_argument("--only", help="comma-separated substrings of case names")
+    r.add_argument("--repeat", type=int, default=3)
+    r.add_argument("--out", help="result JSON (default benchmarks/results/<utc stamp>.json)")
+    c=sub.add_parser("compare"); c.set_defaults(fn=cmd_compare)
+    c.add_argument("base"); c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    a=p.parse_args(); a.fn(a)
+
+if __name__=="__main__": main()
@@ -0,0 +1,197 @@
+"""
+Benchmark cases. Each case is setup(n) -> zero-arg callable doing n units of
+work (bars, ticks, calls); only the callable is timed. All inputs are seeded
+and synthetic, nothing touches the network.
+"""
+import os, random, tempfile, contextlib
+import numpy as np
+
+CASES = {}  # name -> (setup, max_scale, unit)
+WARM = 53   # runner warm-up window for the default params (max(slow, mr_p, fvg_lb, atr_p)+3)
+
+def case(name, max_scale=10**7, unit="bar"):
+    def deco(fn): CASES[name]=(fn, max_scale, unit); return fn
+    return deco
+
+def _bars(n, seed=7):
+    from unibot.sandbox.synth import generate
+    return generate(n, seed=seed)
+
+def _ohlc(n):
+    b=_bars(n); return list(zip(b["o"].tolist(), b["h"].tolist(), b["l"].tolist(), b["c"].tolist()))
+
+def _quiet_jlog():
+    from unibot.sandbox import instrumentation
+    instrumentation.configure(stdout=False)
+
+@contextlib.contextmanager
+def _cwd_tmp():
+    old=os.getcwd()
+    with tempfile.TemporaryDirectory() as d:
+        os.chdir(d)
+        try: yield
+        finally: os.chdir(old)
+
+# --- sandbox ---
+@case("mathlib.atr", unit="bar")
+def atr_ref(n):
+    from unibot.sandbox.mathlib import atr
+    ohlc=_ohlc(n+WARM)
+    def go():  # recompute over the trailing window every bar, as the runner used to
+        for i in range(WARM, n+WARM): atr(ohlc[i-WARM:i], 14)
+    return go
+
+@case("mathlib.RollingATR", unit="bar")
+def atr_rolling(n):
+    from unibot.sandbox.mathlib import RollingATR
+    ohlc=_ohlc(n)
+    def go():
+        r=RollingATR(14)
+        for o,h,l,c in ohlc: r.update(o,h,l,c)
+        return r.value()
+    return go
+
+@case("signals.aggregate_signal", unit="bar")
+def agg_ref(n):
+    from unibot.sandbox.signals import aggregate_signal
+    ohlc=_ohlc(n+WARM)
+    def go():
+        for i in range(WARM, n+WARM): aggregate_signal(ohlc[i-WARM:i], .6, .25, .15, 50, 10, 30, 50)
+    return go
+
+@case("signals.SignalAggregator", unit="bar")
+def agg_stream(n):
+    from unibot.sandbox.signals import SignalAggregator
+    ohlc=_ohlc(n)
+    def go():
+        a=SignalAggregator(.6, .25, .15, 50, 10, 30, 50)
+        for o,h,l,c in ohlc: a.update(o,h,l,c); a.signal()
+    return go
+
+@case("SandboxBroker.mark", unit="tick")
+def broker_mark(n):
+    from unibot.sandbox.broker import SandboxBroker
+    _quiet_jlog(); closes=_bars(n)["c"].tolist(); rng=random.Random(1)
+    plan=[(rng.random()<0.05, rng.choice(("LONG","SHORT")), rng.random()*0.004) for _ in range(n)]
+    def go():
+        b=SandboxBroker("EUR_USD")
+        for px,(place,side,d) in zip(closes, plan):
+            b.mark(px)
+            if place: b.place_order(side, 1000.0, px, px+d if side=="LONG" else px-d, px-d if side=="LONG" else px+d)
+        return b.positions()
+    return go
+
+@case("sandbox.jlog", max_scale=10**6, unit="event")
+def jlog_events(n):
+    from unibot.sandbox import instrumentation
+    _quiet_jlog()
+    def go():
+        for i in range(n): instrumentation.jlog("signal.evaluated", side="LONG", confidence=0.61, size=1000.0, i=i)
+        instrumentation.flush()
+    return go
+
+# --- accelerator ---
+def _frame(n):
+    import pandas as pd
+    b=_bars(n)
+    t=np.datetime_as_string(b["ts"].astype("datetime64[ms]").astype("datetime64[s]"))
+    return pd.DataFrame({"time":t, "o":b["o"], "h":b["h"], "l":b["l"], "c":b["c"]})
+
+def _cfg():
+    import yaml
+    from accelerator.engine.replay import ROOT
+    with open(ROOT/"config"/"accelerated_replay.yaml") as f: return yaml.safe_load(f)
+
+@case("strategy_sniper_fvg.signals", unit="bar")
+def sniper_signals(n):
+    from accelerator.engine.strategy_sniper_fvg import signals
+    df=_frame(n); rules=_cfg()["sniper_fvg"]
+    return lambda: signals(df, rules, 0.0001, is_crypto=False)
+
+@case("replay.run", max_scale=10**5, unit="bar")
+def replay_run(n):
+    from accelerator.engine import replay
+    cfg=_cfg(); cfg["fx"]["symbols"]=["EUR/USD"]; cfg["crypto"]["symbols_spot"]=[]
+    cfg["global"]["broker_backend"]="SIM"; frames={"EUR/USD":_frame(n)}
+    def go():
+        with _cwd_tmp(): return replay.run(cfg, frames=frames, report=False)
+    return go
+
+# --- engines / swarm ---
+@case("EnvPolicy.compute", unit="call")
+def env_policy(n):
+    os.environ.setdefault("OCO_TP_EXPR", "entry + side_sign*max(MIN_SL_PIPS*pip, atr*ATR_TP_MULT*(1+ML_W*ml_edge))".replace("ML_W","0.6"))
+    os.environ.setdefault("OCO_SL_EXPR", "entry - side_sign*min(MAX_SL_PIPS*pip, max(MIN_SL_PIPS*pip, atr*ATR_SL_MULT))")
+    from engines.core.oco_policy import EnvPolicy, OcoInputs
+    pol=EnvPolicy(); rng=random.Random(2)
+    inputs=[OcoInputs(1.1+rng.random()*0.01, rng.choice((1,-1)), 0.0001, 0.0005+rng.random()*0.0005,
+                      rng.random(), 10000.0, 1.0) for _ in range(min(n, 10000))]
+    def go():
+        k=len(inputs)
+        for i in range(n): pol.compute(inputs[i%k])
+    return go
+
+@case("swarm.fvg_weight", unit="call")
+def swarm_fvg(n):
+    from swarm.core.fvg import fvg_weight
+    ohlc=_ohlc(max(64, min(n, 100000))); k=len(ohlc)-20
+    wins=[ohlc[i:i+20] for i in range(k)]
+    def go():
+        for i in range(n): fvg_weight(wins[i%k])
+    return go
+
+@case("swarm.FeatureStore.sync", unit="bar")
+def swarm_store(n):
+    from swarm.core.features import FeatureStore
+    ohlc=_ohlc(n+100)
+    def go():  # one new bar per call on a sliding 100-bar list, as the commander sees it
+        st=FeatureStore(snapshot_dir="")
+        for i in range(100, n+100): st.sync("EUR/USD", ohlc[i-100:i])
+    return go
+
+class LogitModel:
+    """sklearn-shaped 2-class logistic model (pure NumPy) so ml_gate can run without a pickle."""
+    def __init__(self, coef, intercept): self.coef_=np.asarray([coef], float); self.intercept_=np.asarray([intercept], float); self.classes_=np.array([0,1])
+    def predict_proba(self, X):
+        z=np.asarray(X, float)@self.coef_[0]+self.intercept_[0]; p=1/(1+np.exp(-z))
+        return np.column_stack([1-p, p])
+
+_ML_KEYS=["atr", "fvg_bear", "fvg_bull"]
+
+def _ml_feats(n):
+    rng=random.Random(3)
+    return [{"atr":rng.random()*20, "fvg_bear":float(rng.random()<0.3), "fvg_bull":float(rng.random()<0.3)} for _ in range(min(n, 10000))]
+
+def _ml_setup(compiled):
+    from swarm.core import ml_gate
+    ml_gate.set_model(LogitModel([0.01, -0.8, 0.9], 0.05), _ML_KEYS, compile=compiled)  # compile=False: model.predict_proba path
+    return ml_gate
+
+@case("ml_gate.predict_proba", unit="call")
+def ml_predict(n):
+    ml_gate=_ml_setup(True); feats=_ml_feats(n)
+    def go():
+        k=len(feats)
+        for i in range(n): ml_gate.predict_proba(feats[i%k])
+    return go
+
+@case("ml_gate.predict_proba[model]", max_scale=10**5, unit="call")
+def ml_predict_model(n):
+    ml_gate=_ml_setup(False); feats=_ml_feats(n)
+    def go():
+        k=len(feats)
+        for i in range(n): ml_gate.predict_proba(feats[i%k])
+    return go
+
+@case("ml_gate.predict_proba_batch", unit="row")
+def ml_predict_batch(n):
+    ml_gate=_ml_setup(True); feats=_ml_feats(n); rows=[feats[i%len(feats)] for i in range(n)]
+    return lambda: ml_gate.predict_proba_batch(rows)
+
+@case("SwarmCommander.scan", max_scale=10**5, unit="symbol")
+def swarm_scan(n):
+    from swarm.core.commander import SwarmCommander, SwarmConfig
+    _ml_setup(True); ohlc=_ohlc(max(64, min(n, 100000))); k=len(ohlc)-20
+    uni={f"S{i}":ohlc[i%k:i%k+20] for i in range(n)}
+    cmd=SwarmCommander(None, cfg=SwarmConfig(ml_thresh_open=2.0, ml_thresh_add=2.0))  # score only, nothing fires
+    return lambda: cmd.scan(uni, 10000.0)
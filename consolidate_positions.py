@@ -6,9 +6,11 @@ Consolidates multiple positions into single unified position with proper OCO pro
 import os
 import sys
 import json
-import requests
+import uuid
 from decimal import Decimal
 from datetime import datetime
+from unibot.adapters.oanda_http import client
+from unibot.adapters.oanda_mirror import AccountMirror
 
 class LivePositionConsolidator:
     def __init__(self):
@@ -19,39 +21,27 @@ class LivePositionConsolidator:
         if not self.api_key or not self.account_id:
             raise ValueError("LIVE credentials required: OANDA_API_KEY, OANDA_ACCOUNT_ID")
             
-        self.headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
+        self.http = client(self.api_url, self.api_key, self.account_id)
+        self.mirror = AccountMirror(self.http)  # snapshot once, /changes deltas after
 
     def get_open_positions(self):
         """Get all open positions - DIRECT API CALL"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/openPositions"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()['positions']
+        self.mirror.sync()
+        return self.mirror.open_positions()
 
     def get_pending_orders(self):
         """Get all pending orders - DIRECT API CALL"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/pendingOrders"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()['orders']
+        self.mirror.sync()
+        return self.mirror.pending_orders()
 
     def cancel_order(self, order_id):
         """Cancel specific order - LIVE API"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/orders/{order_id}/cancel"
-        response = requests.put(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self.http.call("PUT", self.http.acct(f"/orders/{order_id}/cancel"), idempotent=True)
 
     def close_position(self, instrument, side, units):
         """Close specific position - LIVE API"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/positions/{instrument}/close"
-        data = {side: {"units": str(abs(units))}}
-        response = requests.put(url, headers=self.headers, json=data)
-        response.raise_for_status()
-        return response.json()
+        data = {side: str(abs(units))}
+        return self.http.call("PUT", self.http.acct(f"/positions/{instrument}/close"), json=data)
 
     def place_market_order(self, instrument, units, tp_price=None, sl_price=None):
         """Place new market order with OCO - LIVE API"""
@@ -60,7 +50,8 @@ class LivePositionConsolidator:
                 "type": "MARKET",
                 "instrument": instrument,
                 "units": str(units),
-                "timeInForce": "FOK"
+                "timeInForce": "FOK",
+                "clientExtensions": {"id": f"consolidate-{instrument}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"}
             }
         }
         
@@ -70,10 +61,7 @@ class LivePositionConsolidator:
         if sl_price:
             order_spec["order"]["stopLossOnFill"] = {"price": str(sl_price)}
             
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/orders"
-        response = requests.post(url, headers=self.headers, json=order_spec)
-        response.raise_for_status()
-        return response.json()
+        return self.http.place_order(order_spec)  # clientID lookup before any retry
 
     def consolidate_positions(self, instrument, target_sl_price=None, target_tp_price=None):
         """
@@ -4,10 +4,12 @@ LIVE Direct Position Manager - NO CACHE, LIVE API ONLY
 Real-time position monitoring and management with OCO protection
 """
 import os
-import requests
 import json
+import uuid
 from datetime import datetime
 from decimal import Decimal
+from unibot.adapters.oanda_http import client
+from unibot.adapters.oanda_mirror import AccountMirror
 
 class LivePositionManager:
     def __init__(self):
@@ -21,31 +23,25 @@ class LivePositionManager:
         if not self.api_key or not self.account_id:
             raise ValueError("LIVE credentials required")
             
-        self.headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
+        # shared keep-alive client: pooled, gzip, retried GETs, clientID-checked order POSTs
+        self.http = client(self.api_url, self.api_key, self.account_id)
+        # one account snapshot, then /changes deltas before each read
+        self.mirror = AccountMirror(self.http)
 
     def get_live_account_summary(self):
         """DIRECT API - Account summary"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/summary"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()['account']
+        self.mirror.sync()
+        return self.mirror.account
 
     def get_live_positions(self):
         """DIRECT API - All positions"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/openPositions"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()['positions']
+        self.mirror.sync()
+        return self.mirror.open_positions()
 
     def get_live_orders(self):
         """DIRECT API - All pending orders"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/pendingOrders"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()['orders']
+        self.mirror.sync()
+        return self.mirror.pending_orders()
 
     def get_live_pricing(self, instruments):
         """DIRECT API - Real-time pricing"""
@@ -53,12 +49,8 @@ class LivePositionManager:
             instruments = [instruments]
         
         instruments_str = ','.join(instruments)
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/pricing"
         params = {'instruments': instruments_str}
-        
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-        return response.json()['prices']
+        return self.http.call("GET", self.http.acct("/pricing"), params=params)['prices']
 
     def place_oco_order(self, instrument, units, entry_price, tp_price, sl_price):
         """Place market order with OCO protection - LIVE API"""
@@ -71,21 +63,16 @@ class LivePositionManager:
                 "takeProfitOnFill": {"price": str(tp_price)},
                 "stopLossOnFill": {"price": str(sl_price)},
                 "clientExtensions": {
-                    "id": f"live-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+                    "id": f"live-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}",
                     "comment": "LIVE_OCO_PROTECTED"
                 }
             }
         }
         
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/orders"
-        response = requests.post(url, headers=self.headers, json=order_spec)
-        response.raise_for_status()
-        return response.json()
+        return self.http.place_order(order_spec)
 
     def update_stop_loss(self, trade_id, new_sl_price):
         """Update stop loss for existing trade - LIVE API"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/trades/{trade_id}/orders"
-        
         order_spec = {
             "order": {
                 "type": "STOP_LOSS",
@@ -95,21 +82,14 @@ class LivePositionManager:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=order_spec)
-        response.raise_for_status()
-        return response.json()
+        return self.http.call("POST", self.http.acct(f"/trades/{trade_id}/orders"), json=order_spec)
 
     def cancel_order(self, order_id):
         """Cancel order - LIVE API"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/orders/{order_id}/cancel"
-        response = requests.put(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self.http.call("PUT", self.http.acct(f"/orders/{order_id}/cancel"), idempotent=True)
 
     def close_position(self, instrument, side="ALL"):
         """Close position - LIVE API"""
-        url = f"{self.api_url}/v3/accounts/{self.account_id}/positions/{instrument}/close"
-        
         if side == "ALL":
             data = {"longUnits": "ALL", "shortUnits": "ALL"}
         elif side == "LONG":
@@ -119,9 +99,8 @@ class LivePositionManager:
         else:
             raise ValueError("side must be ALL, LONG, or SHORT")
             
-        response = requests.put(url, headers=self.headers, json=data)
-        response.raise_for_status()
-        return response.json()
+        # closing ALL units is safe to repeat
+        return self.http.call("PUT", self.http.acct(f"/positions/{instrument}/close"), json=data, idempotent=True)
 
     def calculate_position_pnl(self, position, current_price):
         """Calculate real-time P&L in pips"""
@@ -1,8 +1,11 @@
+import os, time
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Tuple, Dict, Any, Optional, Mapping
 from .policy import RiskPolicy, oco_from_atr
 from .fvg import fvg_weight, atr_pips
-from .ml_gate import predict_proba
+from .ml_gate import predict_proba, predict_proba_batch
+from .features import FeatureStore
 
 @dataclass
 class SwarmConfig:
@@ -12,6 +15,8 @@ class SwarmConfig:
     ml_thresh_add: float = 0.60
     weight_mix: float = 0.5 # blend ML prob with FVG weight
     units_base: int = 1000
+    max_book_adds: int = 0  # scan(): cap on open adds across the whole book (0 = no cap)
+    scan_budget_s: float = 2.0  # scan(): wall-clock budget for one decision cycle
 
 class BrokerIF:
     """Adapter your router must satisfy."""
@@ -21,13 +26,18 @@ class BrokerIF:
     def ensure_oco(self, ticket:str, tp:Optional[float], sl:float)->None: ...
     def trailing_sl(self, ticket:str, new_sl:float)->None: ...
 
+_pool=None
+def _fire_pool():
+    global _pool
+    if _pool is None: _pool=ThreadPoolExecutor(int(os.getenv("SWARM_CONCURRENCY","8")), thread_name_prefix="swarm")
+    return _pool
+
 class SwarmCommander:
-    def __init__(self, broker:BrokerIF, risk:RiskPolicy=RiskPolicy(), cfg:SwarmConfig=SwarmConfig()):
-        self.broker=broker; self.risk=risk; self.cfg=cfg
+    def __init__(self, broker:BrokerIF, risk:RiskPolicy=RiskPolicy(), cfg:SwarmConfig=SwarmConfig(), store:Optional[FeatureStore]=None):
+        self.broker=broker; self.risk=risk; self.cfg=cfg; self.store=store  # store: features updated once per new candle
+        self.last_scan={}
 
-    def _score(self, side:str, fvg_dir:str, fvg_w:float, feats:Dict)->float:
-        p_long, p_short = predict_proba(feats)
-        p = p_long if side=="long" else p_short
+    def _blend(self, side:str, fvg_dir:str, fvg_w:float, p:float)->float:
         # boost if FVG agrees; dampen if opposes
         if (side=="long" and fvg_dir=="bull") or (side=="short" and fvg_dir=="bear"):
             p = self.cfg.weight_mix*p + (1-self.cfg.weight_mix)*max(0.5, fvg_w)
@@ -35,20 +45,20 @@ class SwarmCommander:
             p = self.cfg.weight_mix*p + (1-self.cfg.weight_mix)*min(0.5, 1-fvg_w)
         return p
 
-    def evaluate_and_trade(self, symbol:str, side:str, candles:List[Tuple[float,float,float,float]], equity_usd:float, existing_adds:int=0)->Dict:
-        """Gate + OCO calc + optional fire. Returns dict with decision + oco if fired."""
-        # Build simple features (extend with your set)
-        atr = atr_pips(candles)
-        fdir,fwt = fvg_weight(candles)
-        feats = {"atr":atr, "fvg_bear":1.0 if fdir=="bear" else 0.0, "fvg_bull":1.0 if fdir=="bull" else 0.0}
-        score = self._score(side, fdir, fwt, feats)
+    def _score(self, side:str, fvg_dir:str, fvg_w:float, feats:Dict)->float:
+        p_long, p_short = predict_proba(feats)
+        return self._blend(side, fvg_dir, fvg_w, p_long if side=="long" else p_short)
 
-        thresh = self.cfg.ml_thresh_open if existing_adds==0 else self.cfg.ml_thresh_add
-        decision = {"score":score, "threshold":thresh, "allowed": score>=thresh, "atr_pips":atr, "fvg_dir":fdir, "fvg_weight":fwt}
-        if not decision["allowed"]:
-            decision["status"]="blocked"
-            return decision
+    def _features(self, symbol:str, candles:List[Tuple[float,float,float,float]], bar_count:Optional[int]=None):
+        if self.store is not None:
+            st = self.store.sync(symbol, candles, bar_count)
+            return st.atr, st.fvg_dir, st.fvg_w, st.feats
+        # Build simple features (extend with your set, or pass a FeatureStore)
+        atr = atr_pips(candles)
+        fdir,fwt = fvg_weight(candles, atr=atr)
+        return atr, fdir, fwt, {"atr":atr, "fvg_bear":1.0 if fdir=="bear" else 0.0, "fvg_bull":1.0 if fdir=="bull" else 0.0}
 
+    def _fire(self, symbol:str, side:str, atr:float, decision:Dict)->Dict:
         # Position sizing: tiny risk; assume 10-pip pipValue ≈ $1 per 10k
         units = self.cfg.units_base
         entry = self.broker.price(symbol)
@@ -58,3 +68,73 @@ class SwarmCommander:
         ticket = self.broker.place_market_with_oco(symbol, side, units, tp, sl, {"type":"swarm","sl_immutable":str(self.risk.sl_immutable)})
         decision.update({"status":"fired","ticket":ticket,"entry":entry,"tp":tp,"sl":sl,"units":units})
         return decision
+
+    def evaluate_and_trade(self, symbol:str, side:str, candles:List[Tuple[float,float,float,float]], equity_usd:float, existing_adds:int=0, bar_count:Optional[int]=None)->Dict:
+        """
+        Gate + OCO calc + optional fire. Returns dict with decision + oco if fired.
+        bar_count: running number of bars up to candles[-1], lets the feature store align exactly.
+        """
+        atr, fdir, fwt, feats = self._features(symbol, candles, bar_count)
+        score = self._score(side, fdir, fwt, feats)
+
+        thresh = self.cfg.ml_thresh_open if existing_adds==0 else self.cfg.ml_thresh_add
+        decision = {"score":score, "threshold":thresh, "allowed": score>=thresh, "atr_pips":atr, "fvg_dir":fdir, "fvg_weight":fwt}
+        if not decision["allowed"]:
+            decision["status"]="blocked"
+            return decision
+        return self._fire(symbol, side, atr, decision)
+
+    def scan(self, universe:Mapping[str,List[Tuple[float,float,float,float]]], equity_usd:float,
+             existing_adds:Optional[Mapping]=None, sides:Tuple[str,...]=("long","short"), budget_s:Optional[float]=None,
+             bar_counts:Optional[Mapping[str,int]]=None)->List[Dict]:
+        """
+        One decision cycle over {symbol: candles}: features for every symbol, one batched
+        inference for all (symbol, side) rows, thresholds plus max_adds per symbol and
+        max_book_adds across the book (best scores first, one side per symbol), then the
+        accepted orders fire concurrently. existing_adds is keyed by symbol or (symbol, side);
+        bar_counts (symbol -> running bar count) is passed to the feature store.
+        Orders still in flight when the budget runs out are reported as "pending"; they are
+        not cancelled and update their decision in place on completion. Returns one decision per (symbol, side), in universe order; timings in
+        self.last_scan.
+        """
+        t0=time.perf_counter(); budget=self.cfg.scan_budget_s if budget_s is None else budget_s
+        adds=existing_adds or {}
+        syms=list(universe); counts=bar_counts or {}
+        feats=[self._features(sym, universe[sym], counts.get(sym)) for sym in syms]
+        t1=time.perf_counter()
+        P=predict_proba_batch([f[3] for f in feats])  # (n,2): p_long, p_short
+        t2=time.perf_counter()
+
+        out=[]; cands=[]; book=sum(adds.values())
+        for i,sym in enumerate(syms):
+            atr, fdir, fwt, _ = feats[i]
+            for side in sides:
+                n_adds=adds.get((sym,side), adds.get(sym, 0))
+                score=self._blend(side, fdir, fwt, float(P[i,0] if side=="long" else P[i,1]))
+                thresh=self.cfg.ml_thresh_open if n_adds==0 else self.cfg.ml_thresh_add
+                d={"symbol":sym, "side":side, "score":score, "threshold":thresh, "allowed":score>=thresh,
+                   "atr_pips":atr, "fvg_dir":fdir, "fvg_weight":fwt}
+                if not d["allowed"]: d["status"]="blocked"
+                elif n_adds>=self.cfg.max_adds: d.update(allowed=False, status="blocked", reason=f"max-adds: {self.cfg.max_adds}")
+                else: cands.append((score, len(out)))
+                out.append(d)
+
+        taken=set()
+        for score, j in sorted(cands, key=lambda c: -c[0]):
+            d=out[j]
+            if d["symbol"] in taken: d.update(allowed=False, status="blocked", reason="opposite-side-preferred"); continue
+            if self.cfg.max_book_adds and book>=self.cfg.max_book_adds:
+                d.update(allowed=False, status="blocked", reason=f"max-book-adds: {self.cfg.max_book_adds}"); continue
+            taken.add(d["symbol"]); book+=1; d["status"]="accepted"
+
+        pool=_fire_pool()
+        futs={pool.submit(self._fire, d["symbol"], d["side"], d["atr_pips"], d):d for d in out if d["status"]=="accepted"}
+        done, pending=wait(futs, timeout=max(0.0, budget-(time.perf_counter()-t0)))
+        for f in done:
+            if f.exception() is not None: futs[f].update(status="error", error=repr(f.exception()))
+        for f in pending: futs[f]["status"]="pending"
+        t3=time.perf_counter()
+        self.last_scan={"symbols":len(syms), "rows":len(out), "fired":sum(d["status"]=="fired" for d in out), "pending":len(pending),
+                        "features_ms":round((t1-t0)*1e3,3), "score_ms":round((t2-t1)*1e3,3), "fire_ms":round((t3-t2)*1e3,3),
+                        "total_ms":round((t3-t0)*1e3,3), "over_budget":t3-t0>budget}
+        return out
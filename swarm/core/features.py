@@ -0,0 +1,128 @@
+"""
+Per-symbol feature store: ATR, FVG direction/weight and any registered extra model
+features are updated once per new candle, and reads are dict lookups.
+
+sync(symbol, candles, count) takes the same (o,h,l,c) list the commander gets and feeds
+only the candles it has not seen (the list may grow or slide). It aligns on count, the
+running number of bars the feed has produced up to candles[-1]; without it, on the
+identity of the last candle object it was fed (a feed appends new tuples, so equal-valued
+flat bars still count as new). Anything that does not line up is rebuilt from the tail,
+which is exact, just not incremental. The state each sync() returns can be appended to a
+JSONL snapshot (SWARM_FEATURE_LOG dir, one file per UTC day; "n" is the bar count when
+sync was given one, else null), so offline training reads back exactly the values live
+trading scored with: read_snapshots() / training_rows().
+"""
+import os, json, time, threading
+from collections import deque
+from typing import List, Tuple, Dict, Callable, Optional, Iterable
+from .fvg import true_range, fvg_weight
+
+Candle = Tuple[float,float,float,float]
+MODEL_KEYS = ["atr", "fvg_bear", "fvg_bull"]
+
+class SymbolFeatures:
+    __slots__=("last3","tr","n","counted","atr","fvg_dir","fvg_w","feats","t")
+    def __init__(self, atr_n):
+        # n: feed position of the last candle; only a real bar count when counted (sync was given count)
+        self.last3=deque(maxlen=3); self.tr=deque(maxlen=atr_n); self.n=0; self.counted=False
+        self.atr=10.0; self.fvg_dir="none"; self.fvg_w=0.0; self.feats={}; self.t=0.0
+
+class FeatureStore:
+    def __init__(self, atr_n:int=14, snapshot_dir:Optional[str]=None):
+        self.atr_n=atr_n; self._sym:Dict[str,SymbolFeatures]={}
+        self._extras:Dict[str,Callable]={}; self._lock=threading.Lock()
+        self.snapshot_dir=snapshot_dir if snapshot_dir is not None else os.getenv("SWARM_FEATURE_LOG") or None
+        self._fh=None; self._day=None
+        self.stats={"updates":0, "rebuilds":0}
+
+    def register(self, name:str, fn:Callable[[SymbolFeatures, Candle], float]):
+        """Extra model feature, computed once per candle as fn(state, candle) after ATR/FVG are updated."""
+        self._extras[name]=fn; return fn
+
+    def keys(self)->List[str]:
+        return MODEL_KEYS+list(self._extras)
+
+    # --- updates ---
+    def update(self, symbol:str, candle:Candle, ts:Optional[float]=None, log:bool=True)->SymbolFeatures:
+        s=self._sym.get(symbol)
+        if s is None: s=self._sym[symbol]=SymbolFeatures(self.atr_n)
+        o,h,l,c=candle
+        if s.last3: s.tr.append(true_range(h, l, s.last3[-1][3]))
+        s.last3.append(candle); s.n+=1
+        s.atr=(sum(s.tr)/len(s.tr))*10000.0 if s.tr else 10.0  # == fvg.atr_pips(candles, atr_n)
+        s.fvg_dir, s.fvg_w=fvg_weight(s.last3, atr=s.atr)
+        f={"atr":s.atr, "fvg_bear":1.0 if s.fvg_dir=="bear" else 0.0, "fvg_bull":1.0 if s.fvg_dir=="bull" else 0.0}
+        for k,fn in self._extras.items(): f[k]=float(fn(s, candle))
+        s.feats=f; s.t=time.time() if ts is None else ts
+        self.stats["updates"]+=1
+        if log and self.snapshot_dir: self._write(symbol, s)
+        return s
+
+    def sync(self, symbol:str, candles:List[Candle], count:Optional[int]=None)->SymbolFeatures:
+        """
+        Feed the candles not yet seen; a list that no longer lines up with the store is rebuilt.
+        Only the returned state (the one the caller scores) goes to the snapshot, never the
+        intermediate bars or the rebuild warm-up.
+        """
+        s=self._sym.get(symbol)
+        if not candles: return s or self._empty(symbol)
+        new=None
+        if s is not None and s.last3:
+            if count is not None:
+                k=count-s.n
+                if k==0: return s
+                if 0<k<=len(candles): new=candles[-k:]
+            else:
+                last=s.last3[-1]
+                for i in range(len(candles)-1, -1, -1):  # newest-first: a live list is only a few bars ahead
+                    if candles[i] is last: new=candles[i+1:]; break
+                if new is not None and not new: return s
+        if new is None:
+            self.stats["rebuilds"]+=1
+            new=candles[-(self.atr_n+1):]  # enough history for the ATR window
+            s=self._sym[symbol]=SymbolFeatures(self.atr_n)
+            if count is not None: s.n=count-len(new); s.counted=True
+        for c in new: s=self.update(symbol, c, log=False)
+        if self.snapshot_dir: self._write(symbol, s)
+        return s
+
+    def _empty(self, symbol):
+        s=self._sym[symbol]=SymbolFeatures(self.atr_n)
+        s.feats={"atr":s.atr, "fvg_bear":0.0, "fvg_bull":0.0, **{k:0.0 for k in self._extras}}
+        return s
+
+    # --- O(1) reads ---
+    def get(self, symbol:str)->Optional[SymbolFeatures]:
+        return self._sym.get(symbol)
+    def features(self, symbol:str)->Dict[str,float]:
+        s=self._sym.get(symbol); return s.feats if s else {}
+    def symbols(self)->List[str]:
+        return list(self._sym)
+
+    # --- snapshots ---
+    def _write(self, symbol, s):
+        day=time.strftime("%Y%m%d", time.gmtime(s.t))
+        with self._lock:
+            if day!=self._day:
+                if self._fh: self._fh.close()
+                os.makedirs(self.snapshot_dir, exist_ok=True)
+                self._fh=open(os.path.join(self.snapshot_dir, f"features-{day}.jsonl"), "a", buffering=1); self._day=day
+            self._fh.write(json.dumps({"ts":s.t, "symbol":symbol, "n":s.n if s.counted else None, "fvg_dir":s.fvg_dir, "fvg_weight":s.fvg_w,
+                                       "candle":list(s.last3[-1]), "features":s.feats}, separators=(",",":"))+"\n")
+
+    def close(self):
+        with self._lock:
+            if self._fh: self._fh.close(); self._fh=None; self._day=None
+
+def read_snapshots(paths:Iterable[str])->Iterable[Dict]:
+    for p in paths:
+        with open(p) as f:
+            for line in f:
+                if line.strip(): yield json.loads(line)
+
+def training_rows(paths:Iterable[str], keys:Optional[List[str]]=None):
+    """(symbols, timestamps, X) from snapshot files, X in `keys` order (default MODEL_KEYS)."""
+    keys=keys or MODEL_KEYS; syms=[]; ts=[]; X=[]
+    for r in read_snapshots(paths):
+        syms.append(r["symbol"]); ts.append(r["ts"]); X.append([r["features"][k] for k in keys])
+    return syms, ts, X
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 def true_range(h, l, c_prev): return max(h-l, abs(h-c_prev), abs(l-c_prev))
 def atr_pips(candles:List[Tuple[float,float,float,float]], n:int=14)->float:
@@ -11,8 +11,8 @@ def atr_pips(candles:List[Tuple[float,float,float,float]], n:int=14)->float:
     if not trs: return 10.0
     return (sum(trs)/len(trs))*10000.0
 
-def fvg_weight(candles:List[Tuple[float,float,float,float]])->Tuple[str,float]:
-    """Return ('bull'|'bear'|'none', weight 0..1) based on fresh FVG size vs ATR."""
+def fvg_weight(candles:List[Tuple[float,float,float,float]], atr:Optional[float]=None)->Tuple[str,float]:
+    """Return ('bull'|'bear'|'none', weight 0..1) based on fresh FVG size vs ATR (pass atr if already known)."""
     if len(candles)<3: return ("none",0.0)
     o1,h1,l1,c1 = candles[-3]
     o2,h2,l2,c2 = candles[-2]
@@ -23,6 +23,6 @@ def fvg_weight(candles:List[Tuple[float,float,float,float]])->Tuple[str,float]:
         direction="bear"; gap=(l1-h3)
     elif l3 > h1:
         direction="bull"; gap=(l3-h1)
-    atr=atr_pips(candles)
+    if atr is None: atr=atr_pips(candles)
     weight=min(1.0, max(0.0, (gap*10000.0)/(atr if atr>0 else 1)))
     return (direction, weight)
@@ -1,29 +1,160 @@
-import os, pickle
-from typing import Dict, Tuple
+import os, math
+from array import array
+from typing import Dict, Tuple, List, Optional, NamedTuple, Any
+import numpy as np
 MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "models"))
 FOREX_MODEL = os.getenv("FOREX_MODEL", os.path.join(MODEL_DIR, "forex_latest.pkl"))
+COMPILED = os.getenv("ML_GATE_COMPILED", "1").lower() in ("1","true","yes")
 
-_model=None
-def _load():
-    global _model
-    if _model is None:
-        with open(FOREX_MODEL, "rb") as f:
-            _model = pickle.load(f)
-    return _model
+class Active(NamedTuple):
+    model: Any                  # fitted model, or None when only the compiled (mmap) form is loaded
+    keys: Optional[List[str]]   # feature order (model.feature_names_in_, manifest, or first call)
+    compiled: Any               # CompiledLinear / CompiledTrees, or None -> model.predict_proba
+    version: Optional[str]
+
+_active:Optional[Active]=None   # swapped as one reference, so readers never see a half-installed model
+
+class CompiledLinear:
+    """Binary logistic-type model as (w, b): p1 = sigmoid(x.w + b)."""
+    kind="linear"
+    def __init__(self, w, b):
+        self.w=np.ascontiguousarray(w, dtype=float); self.b=float(np.ravel(b)[0]); self._wl=self.w.tolist()
+    def arrays(self): return {"w":self.w, "b":np.array([self.b])}
+    def proba(self, X):
+        p1=1.0/(1.0+np.exp(-(X@self.w+self.b)))
+        return np.column_stack([1.0-p1, p1])
+    def proba1(self, x):
+        z=self.b
+        for wi,xi in zip(self._wl, x): z+=wi*xi
+        p1=1.0/(1.0+math.exp(-z)) if z>-700 else 0.0
+        return (1.0-p1, p1)
+
+class CompiledTrees:
+    """Tree / forest classifier flattened into one node table; rows walk all trees at once."""
+    kind="trees"
+    def __init__(self, left, right, feat, thr, value, roots, depth):
+        # arrays may be read-only memmaps shared between processes; nothing here copies them
+        self.left=left; self.right=right; self.feat=feat; self.thr=thr; self.value=value; self.roots=roots
+        self.depth=int(np.ravel(depth)[0]); self._py=None
+    @classmethod
+    def from_trees(cls, trees):
+        L=[];R=[];F=[];T=[];V=[];roots=[];off=0; depth=0
+        for t in trees:
+            n=t.node_count; roots.append(off)
+            L.append(np.where(t.children_left>=0, t.children_left+off, -1)); R.append(np.where(t.children_right>=0, t.children_right+off, -1))
+            F.append(t.feature); T.append(t.threshold)
+            v=t.value[:,0,:]; V.append(v/np.maximum(v.sum(1, keepdims=True), 1e-12))
+            off+=n; depth=max(depth, t.max_depth)
+        return cls(np.concatenate(L), np.concatenate(R), np.concatenate(F).astype(np.intp), np.concatenate(T),
+                   np.concatenate(V), np.asarray(roots, dtype=np.intp), depth)
+    def arrays(self):
+        return {"left":self.left, "right":self.right, "feat":self.feat, "thr":self.thr, "value":self.value,
+                "roots":self.roots, "depth":np.array([self.depth])}
+    def proba(self, X):
+        n=len(X); node=np.broadcast_to(self.roots, (n, len(self.roots))).copy(); rows=np.arange(n)[:,None]
+        X=np.asarray(X, dtype=np.float32)  # sklearn trees split on float32 inputs
+        for _ in range(self.depth):
+            f=self.feat[node]; leaf=f<0
+            go_left=X[rows, np.where(leaf, 0, f)]<=self.thr[node]
+            node=np.where(leaf, node, np.where(go_left, self.left[node], self.right[node]))
+        return self.value[node].mean(axis=1)
+    def proba1(self, x):
+        if self._py is None:  # per-process list copy for the single-row walk, built on first use
+            self._py=(self.left.tolist(), self.right.tolist(), self.feat.tolist(), self.thr.tolist(), self.value.tolist(), self.roots.tolist())
+        L,R,F,T,V,roots=self._py; acc=None; x=array("f", x).tolist()
+        for nd in roots:
+            while F[nd]>=0: nd=L[nd] if x[F[nd]]<=T[nd] else R[nd]
+            v=V[nd]; acc=list(v) if acc is None else [a+b for a,b in zip(acc,v)]
+        k=len(roots); return tuple(a/k for a in acc)
+
+def compile_model(m, n_features):
+    """NumPy form of a fitted binary classifier, verified against m.predict_proba; None if unsupported."""
+    c=None
+    try:
+        if hasattr(m, "tree_"): c=CompiledTrees.from_trees([m.tree_])
+        elif hasattr(m, "estimators_") and all(hasattr(e, "tree_") for e in np.ravel(m.estimators_)) \
+                and type(m).__name__ in ("RandomForestClassifier","ExtraTreesClassifier"):
+            c=CompiledTrees.from_trees([e.tree_ for e in m.estimators_])
+        elif hasattr(m, "coef_") and np.shape(m.coef_)[0]==1 and len(getattr(m, "classes_", ()))==2:
+            c=CompiledLinear(np.ravel(m.coef_), getattr(m, "intercept_", [0.0]))
+        if c is None: return None
+        probe=np.random.default_rng(0).normal(size=(16, n_features))
+        if not np.allclose(c.proba(probe), np.asarray(m.predict_proba(probe), dtype=float), atol=1e-9): return None
+    except Exception:
+        return None
+    return c
+
+KINDS={"linear":CompiledLinear, "trees":CompiledTrees}
+
+def from_arrays(kind:str, arrays:Dict[str,np.ndarray]):
+    """Rebuild a compiled model from arrays() output (e.g. np.load(..., mmap_mode="r"))."""
+    return KINDS[kind](**arrays)
+
+def set_model(m, keys:Optional[List[str]]=None, compiled=None, version:Optional[str]=None, compile:bool=COMPILED)->Active:
+    """
+    Install a fitted model (and/or a ready compiled form) in one swap; feature order from
+    keys, model.feature_names_in_, or the first call.
+    """
+    global _active
+    names=list(keys) if keys else (list(m.feature_names_in_) if hasattr(m, "feature_names_in_") else None)
+    if compiled is None and compile and names and m is not None: compiled=compile_model(m, len(names))
+    _active=a=Active(m, names, compiled, version)
+    return a
+
+def _load()->Active:
+    a=_active
+    if a is None:
+        from .model_registry import get_registry
+        a=get_registry().ensure_loaded()
+    return a
+
+def _order(a:Active, features:Dict)->Active:
+    global _active
+    if a.keys is None:
+        keys=sorted(features.keys())
+        c=a.compiled or (compile_model(a.model, len(keys)) if COMPILED and a.model is not None else None)
+        b=Active(a.model, keys, c, a.version)
+        if _active is a: _active=b  # don't clobber a model swapped in meanwhile
+        return b
+    return a
 
 def predict_proba(features:Dict)->Tuple[float,float]:
     """
     Returns (p_long, p_short) from your sklearn-like model.
-    Features dict -> 1xN vector via stable key order.
+    Features dict -> 1xN vector via the key order fixed at load.
     """
-    m = _load()
-    keys = sorted(features.keys())
-    x = [[features[k] for k in keys]]
+    a = _load()
     try:
-        proba = m.predict_proba(x)[0]
+        a = _order(a, features)
+        x = [features[k] for k in a.keys]
+        if a.compiled is not None: return a.compiled.proba1(x)
+        proba = a.model.predict_proba([x])[0]
         # assume class order [long, short] if labeled as such; fallback evenly
         if len(proba)==2: return (float(proba[0]), float(proba[1]))
     except Exception:
         pass
     # fallback neutral
     return (0.5, 0.5)
+
+def predict_proba_batch(rows)->np.ndarray:
+    """
+    (n,2) array of (p_long, p_short) for many rows in one call: a list of feature dicts
+    or an (n, n_features) matrix already in feature_order(). Failed batches return 0.5s.
+    """
+    a = _load()
+    if len(rows)==0: return np.empty((0,2))
+    try:
+        if isinstance(rows[0], dict):
+            a=_order(a, rows[0]); X=np.array([[r[k] for k in a.keys] for r in rows], dtype=float)
+        else: X=np.asarray(rows, dtype=float)
+        P = a.compiled.proba(X) if a.compiled is not None else np.asarray(a.model.predict_proba(X), dtype=float)
+        if P.shape[1]==2: return P
+    except Exception:
+        pass
+    return np.full((len(rows),2), 0.5)
+
+def feature_order()->Optional[List[str]]:
+    a=_active; return a.keys if a else None
+
+def current()->Optional[Active]:
+    return _active
@@ -0,0 +1,175 @@
+"""
+Versioned model registry for ml_gate: hot reload without restarts.
+
+Versions are MODEL_DIR/forex_v<N>.pkl (highest N wins; ML_MODEL_VERSION=<N> pins one),
+with an optional forex_v<N>.json manifest ({"features": [...]}). With no versioned
+files the legacy FOREX_MODEL file is used. A daemon thread polls the directory every
+ML_MODEL_POLL seconds (0 disables); a new or changed file is loaded, validated and
+compiled off the inference path, then installed with one ml_gate.set_model() swap.
+A file that fails validation is skipped until it changes again, and the running model
+stays in place. Deploy by writing a new version (or os.replace() into place).
+
+Schema checks: manifest features vs model.feature_names_in_ / n_features_in_, the
+same feature set as the running model, and a probe predict_proba of shape (1, 2).
+A model with no declared schema (legacy pickle fit on plain arrays) keeps the
+running feature order, or ml_gate's sorted-keys order on first call.
+
+Compiled arrays (ml_gate.CompiledLinear / CompiledTrees) are written once per model
+content hash to MODEL_DIR/.compiled/<stem>-<sha>/ as .npy and opened with
+mmap_mode="r", so every process on the host maps the same read-only pages and later
+processes skip the unpickle entirely (ML_MODEL_MMAP=0 disables).
+"""
+import os, re, json, glob, time, pickle, hashlib, shutil, threading
+from typing import Optional, Dict, List
+import numpy as np
+from . import ml_gate
+
+POLL_SECS = float(os.getenv("ML_MODEL_POLL", "5"))
+MMAP = os.getenv("ML_MODEL_MMAP", "1").lower() in ("1","true","yes")
+_VER = re.compile(r"_v(\d+)\.pkl$")
+
+class ModelRejected(ValueError):
+    pass
+
+def _features(m, manifest:Dict)->Optional[List[str]]:
+    want=manifest.get("features"); have=list(m.feature_names_in_) if hasattr(m, "feature_names_in_") else None
+    if want and have and list(want)!=have: raise ModelRejected(f"manifest features {want} != model.feature_names_in_ {have}")
+    names=list(want or have or []) or None
+    n=getattr(m, "n_features_in_", None)
+    if names and n is not None and n!=len(names): raise ModelRejected(f"model expects {n} features, schema has {len(names)}")
+    return names
+
+def _same_schema(keys, live):
+    if live and set(keys)!=set(live): raise ModelRejected(f"feature schema changed: {sorted(keys)} != running {sorted(live)}")
+
+def _probe(m, n:int):
+    try: p=np.asarray(m.predict_proba(np.zeros((1, n))), dtype=float)
+    except Exception as e: raise ModelRejected(f"predict_proba probe failed: {e!r}") from e
+    if p.shape!=(1,2) or not np.isfinite(p).all(): raise ModelRejected(f"predict_proba probe returned {p.shape} {p.tolist()}")
+
+class ModelRegistry:
+    def __init__(self, model_dir=None, legacy_path=None, poll_secs=None, cache_dir=None, mmap=None):
+        self.dir=model_dir or ml_gate.MODEL_DIR; self.legacy=legacy_path or ml_gate.FOREX_MODEL
+        self.poll_secs=POLL_SECS if poll_secs is None else float(poll_secs)
+        self.cache_dir=cache_dir or os.path.join(self.dir, ".compiled"); self.mmap=MMAP if mmap is None else mmap
+        self.pin=os.getenv("ML_MODEL_VERSION")
+        self._sig=None; self._rejected={}; self._lock=threading.Lock(); self._stop=threading.Event(); self._thread=None
+        self.history=[]  # [(loaded_at, version, source)]
+        self.stats={"loads":0, "rejects":0, "mmap_hits":0, "last_error":None, "last_load_ms":0.0}
+
+    # --- discovery ---
+    def candidate(self)->Optional[str]:
+        """Path of the version that should be live (highest/pinned forex_v<N>.pkl, else FOREX_MODEL)."""
+        vers=[(int(m.group(1)), p) for p in glob.glob(os.path.join(self.dir, "*_v*.pkl")) if (m:=_VER.search(p))]
+        if self.pin: vers=[v for v in vers if str(v[0])==self.pin]
+        if vers: return max(vers)[1]
+        return self.legacy if os.path.exists(self.legacy) else None
+
+    def _signature(self, path):
+        st=os.stat(path); man=path[:-4]+".json"
+        mst=os.stat(man).st_mtime_ns if os.path.exists(man) else 0
+        return (os.path.realpath(path), st.st_mtime_ns, st.st_size, mst)
+
+    # --- load / validate / swap ---
+    def check(self)->Optional[ml_gate.Active]:
+        """One poll: load and install the candidate if it changed. Returns the new Active or None."""
+        with self._lock:
+            path=self.candidate()
+            if path is None: return None
+            try: sig=self._signature(path)
+            except FileNotFoundError: return None
+            if sig==self._sig or sig in self._rejected: return None
+            try:
+                a=self.load(path)
+            except (ModelRejected, OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+                self._rejected[sig]=repr(e); self.stats["rejects"]+=1; self.stats["last_error"]=f"{os.path.basename(path)}: {e!r}"
+                return None
+            self._sig=sig; return a
+
+    def load(self, path)->ml_gate.Active:
+        t0=time.perf_counter()
+        with open(path, "rb") as f: raw=f.read()
+        sha=hashlib.sha1(raw).hexdigest()[:12]; stem=os.path.basename(path)[:-4]
+        version=f"{stem}:{sha}"; live=ml_gate.feature_order()
+        cdir=os.path.join(self.cache_dir, f"{stem}-{sha}")
+        c, keys, m=(self._open_cached(cdir) if self.mmap else None) or (None, None, None)
+        if c is None:
+            m=pickle.loads(raw)
+            man=path[:-4]+".json"
+            manifest=json.load(open(man)) if os.path.exists(man) else {}
+            declared=_features(m, manifest)
+            if declared: _same_schema(declared, live)
+            # no manifest / feature_names_in_: take the running order, or let ml_gate fix sorted keys on first call
+            keys=declared or live; n=len(keys) if keys else getattr(m, "n_features_in_", None)
+            if keys and getattr(m, "n_features_in_", n)!=n: raise ModelRejected(f"model expects {m.n_features_in_} features, running schema has {n}")
+            if n: _probe(m, n)
+            c=ml_gate.compile_model(m, len(keys)) if ml_gate.COMPILED and keys else None
+            if c is not None and self.mmap:
+                c=self._save_compiled(cdir, c, keys, version) or c
+                m=None  # the mapped arrays are the model now; drop the unpickled copy
+        if keys: _same_schema(keys, live)
+        a=ml_gate.set_model(m, keys, compiled=c, version=version)
+        self.stats["loads"]+=1; self.stats["last_load_ms"]=round((time.perf_counter()-t0)*1e3, 3)
+        self.history.append((time.time(), version, path))
+        return a
+
+    def _open_cached(self, cdir):
+        meta=os.path.join(cdir, "meta.json")
+        if not os.path.exists(meta): return None
+        try:
+            j=json.load(open(meta))
+            arrs={k:np.load(os.path.join(cdir, k+".npy"), mmap_mode="r") for k in j["arrays"]}
+            c=ml_gate.from_arrays(j["kind"], arrs)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self.stats["mmap_hits"]+=1
+        return c, j["keys"], None
+
+    def _save_compiled(self, cdir, c, keys, version):
+        """Write arrays + meta to a temp dir, rename into place, and reopen them mapped."""
+        tmp=f"{cdir}.tmp{os.getpid()}"
+        try:
+            os.makedirs(tmp, exist_ok=True); arrs=c.arrays()
+            for k,v in arrs.items(): np.save(os.path.join(tmp, k+".npy"), np.asarray(v))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({"kind":c.kind, "keys":keys, "version":version, "arrays":sorted(arrs)}, f)
+            try: os.rename(tmp, cdir)
+            except OSError: shutil.rmtree(tmp, ignore_errors=True)  # another process got there first
+        except OSError as e:
+            self.stats["last_error"]=f"compiled cache: {e!r}"; shutil.rmtree(tmp, ignore_errors=True); return None
+        hit=self._open_cached(cdir); self.stats["mmap_hits"]-=bool(hit)
+        return hit[0] if hit else None
+
+    def ensure_loaded(self)->ml_gate.Active:
+        """First-use load (synchronous), then start the watcher."""
+        a=ml_gate.current() or self.check() or ml_gate.current()
+        if a is None:
+            path=self.candidate()
+            raise FileNotFoundError(f"no loadable model in {self.dir}" + (f": {self._rejected.get(self._signature(path))}" if path else ""))
+        if self.poll_secs>0: self.start()
+        return a
+
+    # --- background ---
+    def start(self):
+        if self._thread is None:
+            self._thread=threading.Thread(target=self._loop, name="ml-model-watch", daemon=True); self._thread.start()
+        return self
+    def stop(self):
+        self._stop.set()
+    def _loop(self):
+        while not self._stop.wait(self.poll_secs):
+            try: self.check()
+            except Exception as e: self.stats["last_error"]=repr(e)
+
+    def summary(self)->dict:
+        a=ml_gate.current()
+        return {"version":a.version if a else None, "compiled":a.compiled.kind if a and a.compiled is not None else None,
+                "mmap":bool(a and a.model is None and a.compiled is not None), **self.stats}
+
+_registry=None; _rlock=threading.Lock()
+
+def get_registry()->ModelRegistry:
+    global _registry
+    with _rlock:
+        if _registry is None: _registry=ModelRegistry()
+    return _registry
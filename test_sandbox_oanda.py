@@ -1,5 +1,5 @@
 import os
-from unibot.core.router import one_shot_entry
+from unibot.core.router import one_shot_entry, warm_up
 
 # --- config ---
 symbol   = os.getenv("TEST_SYMBOL","EUR/USD")
@@ -9,5 +9,6 @@ price    = float(os.getenv("TEST_PRICE","1.10000"))  # used for guard math; mark
 pip_val  = float(os.getenv("TEST_PIP","0.0001"))
 
 print("TRADING_MODE:", os.getenv("TRADING_MODE","(unset)"))
+print("warm connections:", warm_up())  # open the pool before the order, not during it
 r = one_shot_entry(symbol, side, units, price, pip_val, open_count=0, last_fill=None)
 print(r)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Events/sec of the sandbox JSON logger: legacy per-event print+open vs AsyncJsonLogger.
+Usage: python tools/bench_jlog.py [N_EVENTS]   (stdout goes to /dev/null, file to a temp dir)
+"""
+import os, sys, json, time, tempfile, threading, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from unibot.sandbox import instrumentation
+
+_lock = threading.Lock()
+def legacy_jlog(event, **ctx):
+    # verbatim copy of the pre-async jlog, kept here as the "before" baseline
+    rec = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
+           "event": event, "mode": os.getenv("MODE","SANDBOX"), **ctx}
+    line = json.dumps(rec, separators=(",",":"))
+    print(line, flush=True)
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        pathlib.Path(os.path.dirname(log_file)).mkdir(parents=True, exist_ok=True)
+        with _lock, open(log_file, "a", encoding="utf-8") as f: f.write(line+"\n")
+
+def _rate(fn, n):
+    t0=time.perf_counter()
+    for i in range(n): fn("signal.evaluated", side="LONG", confidence=0.6123, atr=0.00042, tp=1.1012, sl=1.0991, size=1234.5, i=i)
+    return n/(time.perf_counter()-t0)
+
+def main():
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 100000
+    tmp=tempfile.mkdtemp(); real=sys.stdout; sys.stdout=open(os.devnull,"w")
+    try:
+        os.environ["LOG_FILE"]=os.path.join(tmp,"legacy.jsonl")
+        before=_rate(legacy_jlog, n)
+        res={"events":n, "legacy_eps":round(before)}
+        for label,stdout in (("async_eps",True),("async_nostdout_eps",False)):
+            instrumentation.configure(path=os.path.join(tmp,f"{label}.jsonl"), stdout=stdout)
+            t0=time.perf_counter(); _rate(instrumentation.jlog, n); instrumentation.flush()
+            res[label]=round(n/(time.perf_counter()-t0))  # includes draining the queue
+        res["speedup"]=round(res["async_eps"]/max(1,before),1)
+    finally:
+        sys.stdout.close(); sys.stdout=real
+    print(json.dumps(res))
+
+if __name__=="__main__": main()
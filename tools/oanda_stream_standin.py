@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OANDA v3 pricing stream (chunked HTTP/1.1, newline-delimited JSON).
+Random-walk PRICE lines for the requested instruments plus a HEARTBEAT every --hb seconds.
+  --drop-after S   close each stream after S seconds (reconnect testing)
+  --stall-after S  stop writing (but keep the socket open) after S seconds (heartbeat-timeout testing)
+Usage: python tools/oanda_stream_standin.py [--port 8765] [--rate 20]
+"""
+import json, time, random, argparse, threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+def _now(): return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def make_handler(a):
+    mids={}; lock=threading.Lock()
+    class H(BaseHTTPRequestHandler):
+        protocol_version="HTTP/1.1"
+        def log_message(self,*x): pass
+        def _chunk(self,obj):
+            b=(json.dumps(obj)+"\n").encode()
+            self.wfile.write(f"{len(b):x}\r\n".encode()+b+b"\r\n"); self.wfile.flush()
+        def do_GET(self):
+            u=urlparse(self.path)
+            if not u.path.endswith("/pricing/stream"):
+                self.send_response(404); self.send_header("Content-Length","0"); self.end_headers(); return
+            ins=[i for i in parse_qs(u.query).get("instruments",[""])[0].split(",") if i]
+            self.send_response(200); self.send_header("Content-Type","application/octet-stream")
+            self.send_header("Transfer-Encoding","chunked"); self.end_headers()
+            t0=time.time(); last_hb=0.0
+            try:
+                while True:
+                    el=time.time()-t0
+                    if a.drop_after and el>a.drop_after: break
+                    if a.stall_after and el>a.stall_after: time.sleep(0.5); continue
+                    for i in ins:
+                        with lock: m=mids[i]=mids.get(i, 150.0 if "JPY" in i else 1.1)*(1+random.gauss(0, 2e-5))
+                        h=m*2e-5
+                        self._chunk({"type":"PRICE","instrument":i,"time":_now(),"tradeable":True,
+                                     "bids":[{"price":f"{m-h:.5f}","liquidity":1000000}],
+                                     "asks":[{"price":f"{m+h:.5f}","liquidity":1000000}],
+                                     "closeoutBid":f"{m-h:.5f}","closeoutAsk":f"{m+h:.5f}"})
+                    if time.time()-last_hb>=a.hb: last_hb=time.time(); self._chunk({"type":"HEARTBEAT","time":_now()})
+                    time.sleep(1.0/a.rate)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError): pass
+            self.close_connection=True
+    return H
+
+def main():
+    p=argparse.ArgumentParser()
+    p.add_argument("--host", default="127.0.0.1"); p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--rate", type=float, default=20.0, help="price ticks per second per instrument")
+    p.add_argument("--hb", type=float, default=5.0, help="heartbeat interval, seconds")
+    p.add_argument("--drop-after", type=float, default=0.0)
+    p.add_argument("--stall-after", type=float, default=0.0)
+    a=p.parse_args()
+    srv=ThreadingHTTPServer((a.host, a.port), make_handler(a))
+    print(f"pricing stream stand-in on http://{a.host}:{srv.server_port}", flush=True)
+    srv.serve_forever()
+
+if __name__=="__main__": main()
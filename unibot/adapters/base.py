@@ -1,4 +1,4 @@
-from typing import Protocol, Optional, Dict, Any
+from typing import Protocol, Optional, Dict, Any, List
 
 class Broker(Protocol):
     def price(self, symbol: str) -> float: ...
@@ -7,4 +7,5 @@ class Broker(Protocol):
                         client_id: str, extras: Optional[Dict[str, Any]] = None) -> Dict[str, Any]: ...
     def cancel(self, broker_order_id: str) -> None: ...
     def open_position(self, symbol: str) -> Dict[str, Any]: ...
+    def open_positions(self) -> List[Dict[str, Any]]: ...
     def consolidate(self, symbol: str) -> Dict[str, Any]: ...
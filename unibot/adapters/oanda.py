@@ -1,29 +1,72 @@
-import os, requests, json
-from typing import Dict, Any
+import os, threading
+from typing import Dict, Any, List
 from .base import Broker
+from .oanda_http import OandaHTTP, client
+from .oanda_stream import PriceStream
+from .oanda_mirror import AccountMirror, _open
+from .scheduler import ACCOUNT
 
 API   = os.getenv("OANDA_API_BASE",   "https://api-fxpractice.oanda.com")
 STREAM= os.getenv("OANDA_STREAM_URL", "https://stream-fxpractice.oanda.com")
 ACCT  = os.getenv("OANDA_ACCOUNT_ID", "")
 KEY   = os.getenv("OANDA_API_KEY",    "")
-
-def _hdr():
-    if not KEY: raise RuntimeError("OANDA_API_KEY not set")
-    return {"Authorization": f"Bearer {KEY}", "Content-Type":"application/json"}
+POOL  = int(os.getenv("OANDA_POOL_SIZE", "8"))   # keep-alive connections per host
+PRICE_STREAM  = os.getenv("OANDA_PRICE_STREAM", "1").lower() in ("1","true","yes")
+PRICE_MAX_AGE = float(os.getenv("OANDA_PRICE_MAX_AGE", "5"))   # seconds a streamed quote stays usable
+MIRROR        = os.getenv("OANDA_MIRROR", "1").lower() in ("1","true","yes")
 
 def _ins(symbol:str)->str:
     return symbol.replace("/","_").upper()
 
-def _pretty(resp:requests.Response)->str:
-    try: return json.dumps(resp.json(), indent=2)
-    except Exception: return f"HTTP {resp.status_code} {resp.text[:400]}"
+def _client()->OandaHTTP:
+    """Shared keep-alive client (pool, gzip, retries, per-endpoint stats); see oanda_http."""
+    return client(API, KEY, ACCT, pool=POOL)
+
+_stream=None; _stream_lock=threading.Lock()
+def pricing()->PriceStream|None:
+    """Process-wide pricing stream (started on first use; OANDA_STREAM_INSTRUMENTS pre-subscribes)."""
+    global _stream
+    if _stream is None and PRICE_STREAM and KEY and ACCT:
+        with _stream_lock:
+            if _stream is None:
+                pre=[_ins(s) for s in os.getenv("OANDA_STREAM_INSTRUMENTS","").split(",") if s.strip()]
+                _stream=PriceStream(STREAM, KEY, ACCT, pre).start()
+    return _stream
+
+_mirror=None
+def mirror()->AccountMirror|None:
+    """Process-wide account mirror (snapshot + /changes, woken by the transactions stream)."""
+    global _mirror
+    if _mirror is None and MIRROR and KEY and ACCT:
+        with _stream_lock:
+            if _mirror is None: _mirror=AccountMirror(_client(), STREAM).start()
+    return _mirror
+
+def warm(n:int=None)->int:
+    """Open up to n pooled connections now (concurrent GETs) so the first orders skip the handshake."""
+    if not KEY or not ACCT: return 0
+    c=_client(); n=max(1, min(n or POOL, POOL)); ok=[]
+    def hit():
+        # straight to _send: request() would coalesce the n identical GETs onto one connection
+        try: ok.append(c._send("GET", c.acct("/summary"), None, None, 10, True, ACCOUNT).ok)
+        except Exception: pass
+    ts=[threading.Thread(target=hit, daemon=True) for _ in range(n)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    return sum(ok)
 
 class Oanda(Broker):
+    def warm(self, n:int=None)->int: return warm(n)
+
     def price(self, symbol:str)->float:
         ins = _ins(symbol)
-        r = requests.get(f"{API}/v3/instruments/{ins}/candles?count=1&price=M", headers=_hdr(), timeout=10)
-        if not r.ok: raise RuntimeError(f"price() failed: {_pretty(r)}")
-        return float(r.json()["candles"][0]["mid"]["c"])
+        ps = pricing()
+        if ps is not None:
+            q = ps.quote(ins, PRICE_MAX_AGE)
+            if q is not None: return q[2]
+            ps.subscribe(ins)  # stale or new instrument: REST this once, stream from now on
+        j = _client().call("GET", f"/v3/instruments/{ins}/candles?count=1&price=M", "price()")
+        return float(j["candles"][0]["mid"]["c"])
 
     def place_order_oco(self, symbol, side, units, entry, tp, sl, client_id, extras=None)->Dict[str,Any]:
         ins = _ins(symbol)
@@ -38,21 +81,26 @@ class Oanda(Broker):
             "stopLossOnFill"  :{"price": f"{sl:.5f}"}
           }
         }
-        r = requests.post(f"{API}/v3/accounts/{ACCT}/orders", json=body, headers=_hdr(), timeout=20)
-        if not r.ok: raise RuntimeError(f"place_order_oco() failed: {_pretty(r)}")
-        return r.json()
+        return _client().place_order(body)  # retried only after a clientID lookup finds nothing
 
     def cancel(self, broker_order_id:str)->None:
-        r = requests.put(f"{API}/v3/accounts/{ACCT}/orders/{broker_order_id}/cancel", headers=_hdr(), timeout=10)
-        if not r.ok: raise RuntimeError(f"cancel() failed: {_pretty(r)}")
+        c = _client()
+        c.call("PUT", c.acct(f"/orders/{broker_order_id}/cancel"), "cancel()", idempotent=True)
 
     def open_position(self, symbol:str)->Dict[str,Any]:
         ins = _ins(symbol)
-        r = requests.get(f"{API}/v3/accounts/{ACCT}/openPositions", headers=_hdr(), timeout=10)
-        if not r.ok: raise RuntimeError(f"open_position() failed: {_pretty(r)}")
-        for p in r.json().get("positions",[]):
+        m = mirror()
+        if m is not None: return m.position(ins)
+        c = _client()
+        for p in c.call("GET", c.acct("/openPositions"), "open_position()").get("positions",[]):
             if p.get("instrument")==ins: return p
         return {}
 
+    def open_positions(self)->List[Dict[str,Any]]:
+        m = mirror()
+        if m is not None: return m.open_positions()
+        c = _client()
+        return [p for p in c.call("GET", c.acct("/openPositions"), "open_positions()").get("positions",[]) if _open(p)]
+
     def consolidate(self, symbol:str)->Dict[str,Any]:
         return {"status":"todo"}
@@ -0,0 +1,205 @@
+"""
+asyncio OANDA adapter: the Broker surface (price, place_order_oco, cancel,
+open_position, consolidate) as coroutines over a stdlib HTTP/1.1 keep-alive pool,
+so one event loop can drive the whole book. OandaSync wraps it for blocking callers
+(one private loop thread shared by all of them). Every request takes a token from the
+account's RequestScheduler (shared with oanda_http), and an order POST with an unknown
+outcome is looked up by client ID before it is retried, as in OandaHTTP.place_order.
+
+  OANDA_POOL_SIZE   connections per host (8)
+  OANDA_RETRIES     max order re-sends after a lookup finds nothing (3)
+  OANDA_BACKOFF     first backoff, seconds; doubles per attempt, full jitter (0.2)
+"""
+import os, ssl, json, gzip, zlib, random, asyncio, threading
+from collections import deque
+from urllib.parse import urlsplit, urlencode
+from .oanda_http import OandaError, RETRY_STATUS, _same_order
+from .scheduler import for_account, classify, ORDER
+from .oanda_mirror import _open
+
+API   = os.getenv("OANDA_API_BASE",   "https://api-fxpractice.oanda.com")
+ACCT  = os.getenv("OANDA_ACCOUNT_ID", "")
+KEY   = os.getenv("OANDA_API_KEY",    "")
+
+def _ins(symbol:str)->str:
+    return symbol.replace("/","_").upper()
+
+class Response:
+    __slots__=("status","headers","body")
+    def __init__(self, status, headers, body): self.status=status; self.headers=headers; self.body=body
+    @property
+    def ok(self): return 200<=self.status<300
+    def json(self): return json.loads(self.body or b"null")
+    def pretty(self):
+        try: return json.dumps(self.json(), indent=2)
+        except ValueError: return f"HTTP {self.status} {self.body[:400]!r}"
+
+class _Host:
+    def __init__(self, size): self.idle=deque(); self.sem=asyncio.Semaphore(size)
+
+class AsyncPool:
+    """Keep-alive HTTP/1.1 connections per (scheme, host, port); Content-Length and chunked bodies, gzip."""
+    def __init__(self, size=None, timeout=20.0):
+        self.size=int(size or os.getenv("OANDA_POOL_SIZE","8")); self.timeout=timeout
+        self._hosts={}; self._ssl=ssl.create_default_context()
+        self.stats={"opened":0, "reused":0}
+
+    async def _connect(self, scheme, host, port):
+        self.stats["opened"]+=1
+        return await asyncio.open_connection(host, port, ssl=self._ssl if scheme=="https" else None,
+                                             server_hostname=host if scheme=="https" else None)
+
+    async def request(self, method, url, headers=None, body:bytes=None, timeout=None)->Response:
+        u=urlsplit(url); scheme=u.scheme; port=u.port or (443 if scheme=="https" else 80)
+        key=(scheme, u.hostname, port); h=self._hosts.get(key)
+        if h is None: h=self._hosts[key]=_Host(self.size)
+        path=(u.path or "/")+(f"?{u.query}" if u.query else "")
+        head=[f"{method} {path} HTTP/1.1", f"Host: {u.netloc}", "Connection: keep-alive", "Accept-Encoding: gzip, deflate",
+              f"Content-Length: {len(body or b'')}"]+[f"{k}: {v}" for k,v in (headers or {}).items()]
+        raw=("\r\n".join(head)+"\r\n\r\n").encode()+(body or b"")
+        async with h.sem:
+            for attempt in (0, 1):
+                reused=bool(h.idle)
+                conn=h.idle.pop() if reused else await self._connect(*key)
+                if reused: self.stats["reused"]+=1
+                try:
+                    resp, keep=await asyncio.wait_for(self._exchange(conn, raw), timeout or self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    conn[1].close()
+                    # a pooled socket the server already closed: safe to resend unless it is a POST
+                    if reused and attempt==0 and method!="POST": continue
+                    raise OandaError(f"{method} {u.path}: {e!r}") from e
+                except BaseException:
+                    conn[1].close(); raise
+                if keep: h.idle.append(conn)
+                else: conn[1].close()
+                return resp
+
+    async def _exchange(self, conn, raw):
+        reader, writer=conn
+        writer.write(raw); await writer.drain()
+        status_line=await reader.readuntil(b"\r\n")
+        if not status_line: raise ConnectionError("connection closed")
+        status=int(status_line.split()[1]); hdrs={}
+        while True:
+            line=await reader.readuntil(b"\r\n")
+            if line==b"\r\n": break
+            k,_,v=line.decode("latin-1").partition(":"); hdrs[k.strip().lower()]=v.strip()
+        if hdrs.get("transfer-encoding","").lower()=="chunked":
+            parts=[]
+            while True:
+                n=int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if n==0:
+                    while (await reader.readuntil(b"\r\n"))!=b"\r\n": pass
+                    break
+                parts.append(await reader.readexactly(n)); await reader.readexactly(2)
+            body=b"".join(parts)
+        elif "content-length" in hdrs: body=await reader.readexactly(int(hdrs["content-length"]))
+        else: body=await reader.read(); hdrs["connection"]="close"
+        enc=hdrs.get("content-encoding","")
+        if enc=="gzip": body=gzip.decompress(body)
+        elif enc=="deflate": body=zlib.decompress(body)
+        return Response(status, hdrs, body), hdrs.get("connection","").lower()!="close"
+
+    async def close(self):
+        for h in self._hosts.values():
+            while h.idle: h.idle.pop()[1].close()
+
+class OandaAsync:
+    def __init__(self, api=None, key=None, account=None, pool:AsyncPool=None, retries=None, backoff=None):
+        self.api=(api or API).rstrip("/"); self.key=key if key is not None else KEY; self.account=account or ACCT
+        self.pool=pool or AsyncPool(); self.scheduler=for_account(self.api, self.account)
+        self.retries=int(retries if retries is not None else os.getenv("OANDA_RETRIES","3"))
+        self.backoff=float(backoff if backoff is not None else os.getenv("OANDA_BACKOFF","0.2"))
+
+    async def _request(self, method, path, params=None, body=None, timeout=None)->Response:
+        if not self.key: raise OandaError("OANDA_API_KEY not set")
+        prio=classify(method, path)
+        if not self.scheduler.try_acquire(prio):  # bucket empty or callers queued: wait off the loop
+            await asyncio.get_running_loop().run_in_executor(None, self.scheduler.acquire, prio)
+        url=self.api+path+(f"?{urlencode(params)}" if params else "")
+        hdr={"Authorization":f"Bearer {self.key}", "Content-Type":"application/json", "Accept-Datetime-Format":"RFC3339"}
+        try: return await self.pool.request(method, url, hdr, json.dumps(body).encode() if body is not None else None, timeout)
+        finally:
+            if method!="GET": self.scheduler.invalidate()
+
+    async def _call(self, method, path, what, params=None, body=None, timeout=None)->dict:
+        r=await self._request(method, path, params, body, timeout)
+        if not r.ok: raise OandaError(f"{what} failed: {r.pretty()}")
+        return r.json()
+
+    async def price(self, symbol:str)->float:
+        j=await self._call("GET", f"/v3/instruments/{_ins(symbol)}/candles", "price()", {"count":1, "price":"M"}, timeout=10)
+        return float(j["candles"][0]["mid"]["c"])
+
+    async def place_order_oco(self, symbol, side, units, entry, tp, sl, client_id, extras=None)->dict:
+        if side not in ("buy","sell"): raise ValueError("side must be 'buy' or 'sell'")
+        body={"order":{"type":"MARKET", "instrument":_ins(symbol),
+                       "units":str(units if side=="buy" else -abs(units)),
+                       "clientExtensions":{"id":client_id},
+                       "takeProfitOnFill":{"price":f"{tp:.5f}"},
+                       "stopLossOnFill":{"price":f"{sl:.5f}"}}}
+        attempt=0
+        while True:
+            r=None
+            try: r=await self._request("POST", f"/v3/accounts/{self.account}/orders", body=body, timeout=20)
+            except (OandaError, OSError, asyncio.TimeoutError) as e:  # dropped/timed out mid-exchange: outcome unknown
+                if not self.key: raise
+                err=e
+            else:
+                if r.ok: return r.json()
+                err=OandaError(f"place_order_oco() failed: {r.pretty()}")
+                if r.status not in RETRY_STATUS: raise err
+            if r is None or r.status!=429:  # 429 is rejected before processing; others may have landed
+                found=await self.order_by_client_id(client_id)
+                if found and _same_order(found, body["order"]): return {"order":found, "recovered":True, "clientID":client_id}
+            if attempt>=self.retries: raise err
+            await asyncio.sleep(random.uniform(0, self.backoff*2**attempt)); attempt+=1
+
+    async def order_by_client_id(self, client_id:str)->dict:
+        r=await self._request("GET", f"/v3/accounts/{self.account}/orders/@{client_id}", timeout=10)
+        return r.json().get("order") if r.ok else None
+
+    async def cancel(self, broker_order_id:str)->None:
+        await self._call("PUT", f"/v3/accounts/{self.account}/orders/{broker_order_id}/cancel", "cancel()", timeout=10)
+
+    async def open_position(self, symbol:str)->dict:
+        ins=_ins(symbol)
+        j=await self._call("GET", f"/v3/accounts/{self.account}/openPositions", "open_position()", timeout=10)
+        return next((p for p in j.get("positions",[]) if p.get("instrument")==ins and _open(p)), {})
+
+    async def open_positions(self)->list:
+        j=await self._call("GET", f"/v3/accounts/{self.account}/openPositions", "open_positions()", timeout=10)
+        return [p for p in j.get("positions",[]) if _open(p)]
+
+    async def consolidate(self, symbol:str)->dict:
+        return {"status":"todo"}
+
+    async def close(self): await self.pool.close()
+
+class OandaSync:
+    """Blocking Broker facade over one shared OandaAsync loop thread."""
+    _loop=None; _lock=threading.Lock()
+
+    @classmethod
+    def _get_loop(cls):
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop=asyncio.new_event_loop()
+                threading.Thread(target=cls._loop.run_forever, name="oanda-async", daemon=True).start()
+        return cls._loop
+
+    def __init__(self, **kw):
+        self._loop=self._get_loop()
+        self.aio=self._run(self._make(kw))
+    async def _make(self, kw): return OandaAsync(**kw)  # pool primitives belong to the loop thread
+    def _run(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def price(self, symbol): return self._run(self.aio.price(symbol))
+    def place_order_oco(self, symbol, side, units, entry, tp, sl, client_id, extras=None):
+        return self._run(self.aio.place_order_oco(symbol, side, units, entry, tp, sl, client_id, extras))
+    def cancel(self, broker_order_id): return self._run(self.aio.cancel(broker_order_id))
+    def open_position(self, symbol): return self._run(self.aio.open_position(symbol))
+    def open_positions(self): return self._run(self.aio.open_positions())
+    def consolidate(self, symbol): return self._run(self.aio.consolidate(symbol))
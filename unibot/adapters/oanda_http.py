@@ -0,0 +1,166 @@
+"""
+Shared OANDA v3 REST client: one keep-alive pool per (host, key), gzip, jittered
+retries for idempotent calls under a retry budget, idempotent order POSTs keyed by
+clientExtensions.id, and per-endpoint latency counters.
+
+  OANDA_POOL_SIZE      keep-alive connections per host (8)
+  OANDA_RETRIES        max retries per idempotent call (3)
+  OANDA_BACKOFF        first backoff, seconds; doubles per attempt, full jitter (0.2)
+  OANDA_RETRY_BUDGET   retries allowed per successful call, long-run ratio (0.2)
+Every attempt also takes a token from the account's RequestScheduler (see scheduler.py).
+"""
+import os, re, time, json, random, threading
+import requests
+from requests.adapters import HTTPAdapter
+from unibot.core.latency import Histogram
+from .scheduler import for_account, classify
+
+RETRY_STATUS={429,500,502,503,504}
+FRESH=("/orders/@", "/changes", "/transactions")  # GETs never served from the TTL cache (still single-flight)
+
+class OandaError(RuntimeError):
+    def __init__(self, msg, resp=None):
+        super().__init__(msg); self.resp=resp
+        self.status=resp.status_code if resp is not None else None
+
+def pretty(resp)->str:
+    try: return json.dumps(resp.json(), indent=2)
+    except Exception: return f"HTTP {resp.status_code} {resp.text[:400]}"
+
+class RetryBudget:
+    """Token bucket: each success deposits `ratio`, each retry spends 1 (capped at `cap`)."""
+    def __init__(self, ratio, cap=10.0):
+        self.ratio=ratio; self.cap=cap; self.tokens=cap; self._lock=threading.Lock()
+    def success(self):
+        with self._lock: self.tokens=min(self.cap, self.tokens+self.ratio)
+    def spend(self)->bool:
+        with self._lock:
+            if self.tokens<1.0: return False
+            self.tokens-=1.0; return True
+
+_ID=re.compile(r"/(\d+|@[^/?]+)(?=/|$)")
+def endpoint(method, path)->str:
+    """Stats key: account, instrument and numeric/@clientID segments folded to placeholders."""
+    p=path.split("?",1)[0]
+    p=re.sub(r"/accounts/[^/]+", "/accounts/{acct}", p)
+    p=re.sub(r"/(instruments|positions)/[A-Z0-9_]+", r"/\1/{ins}", p)
+    return f"{method} {_ID.sub('/{id}', p)}"
+
+class OandaHTTP:
+    def __init__(self, api, key, account, pool=None, retries=None, backoff=None, budget=None):
+        self.api=api.rstrip("/"); self.key=key; self.account=account
+        self.retries=int(retries if retries is not None else os.getenv("OANDA_RETRIES","3"))
+        self.backoff=float(backoff if backoff is not None else os.getenv("OANDA_BACKOFF","0.2"))
+        self.budget=RetryBudget(float(budget if budget is not None else os.getenv("OANDA_RETRY_BUDGET","0.2")))
+        self.pool=int(pool or os.getenv("OANDA_POOL_SIZE","8"))
+        s=requests.Session()
+        ad=HTTPAdapter(pool_connections=2, pool_maxsize=self.pool, max_retries=0)
+        s.mount("https://", ad); s.mount("http://", ad)
+        s.headers.update({"Content-Type":"application/json", "Accept-Encoding":"gzip, deflate",
+                          "Accept-Datetime-Format":"RFC3339"})
+        if key: s.headers["Authorization"]=f"Bearer {key}"
+        self.session=s; self.scheduler=for_account(self.api, account)
+        self._stats={}; self._lock=threading.Lock()
+
+    def _record(self, ep, secs, ok, retried):
+        with self._lock:
+            st=self._stats.get(ep)
+            if st is None: st=self._stats[ep]={"h":Histogram(), "errors":0, "retries":0}
+            st["h"].observe(secs); st["errors"]+=not ok; st["retries"]+=retried
+
+    def stats(self)->dict:
+        with self._lock: items=sorted(self._stats.items())
+        return {ep:{"count":s["h"].count, "errors":s["errors"], "retries":s["retries"],
+                    "mean_ms":s["h"].sum/max(1,s["h"].count)*1e3, "p50_ms":s["h"].quantile(0.5)*1e3,
+                    "p99_ms":s["h"].quantile(0.99)*1e3, "max_ms":s["h"].max*1e3} for ep,s in items}
+
+    def _sleep(self, attempt, resp=None):
+        ra=resp.headers.get("Retry-After") if resp is not None else None
+        try: d=float(ra) if ra else random.uniform(0, self.backoff*2**attempt)
+        except ValueError: d=random.uniform(0, self.backoff*2**attempt)
+        time.sleep(min(d, 10.0))
+
+    def request(self, method, path, *, params=None, json=None, timeout=10, idempotent=None, priority=None, ttl=None)->requests.Response:
+        """
+        One call; GETs (or idempotent=True) retry on connection errors, 429 and 5xx.
+        Identical concurrent GETs are coalesced and briefly cached (ttl, scheduler default);
+        any other method invalidates that cache.
+        """
+        if not self.key: raise OandaError("OANDA_API_KEY not set")
+        prio=classify(method, path) if priority is None else priority
+        if method=="GET":
+            key=(path, tuple(sorted((params or {}).items())))
+            return self.scheduler.get(key, lambda: self._send(method, path, params, json, timeout, True, prio),
+                                      0 if any(f in path for f in FRESH) else ttl)
+        try: return self._send(method, path, params, json, timeout, idempotent, prio)
+        finally: self.scheduler.invalidate()
+
+    def _send(self, method, path, params, json, timeout, idempotent, prio):
+        idempotent=method in ("GET","HEAD") if idempotent is None else idempotent
+        url=path if path.startswith("http") else self.api+path; ep=endpoint(method, path)
+        attempt=0
+        while True:
+            self.scheduler.acquire(prio)
+            t=time.perf_counter(); r=None; err=None
+            try: r=self.session.request(method, url, params=params, json=json, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e: err=e
+            again=(err is not None or r.status_code in RETRY_STATUS)
+            retry=again and idempotent and attempt<self.retries and self.budget.spend()
+            self._record(ep, time.perf_counter()-t, not again, retry)
+            if not again: self.budget.success(); return r
+            if not retry:
+                if err is not None: raise err
+                return r
+            self._sleep(attempt, r); attempt+=1
+
+    def call(self, method, path, what=None, **kw)->dict:
+        """request() + raise OandaError on non-2xx + decoded JSON."""
+        r=self.request(method, path, **kw)
+        if not r.ok: raise OandaError(f"{what or endpoint(method, path)} failed: {pretty(r)}", r)
+        return r.json()
+
+    def acct(self, suffix="")->str:
+        return f"/v3/accounts/{self.account}{suffix}"
+
+    def order_by_client_id(self, client_id):
+        r=self.request("GET", self.acct(f"/orders/@{client_id}"))
+        return r.json().get("order") if r.ok else None
+
+    def place_order(self, body, timeout=20)->dict:
+        """
+        POST an order; when the outcome is unknown (connection drop, timeout, 5xx) look the
+        order up by its clientExtensions.id before retrying, so it is never sent twice.
+        """
+        cid=(body.get("order",{}).get("clientExtensions") or {}).get("id")
+        attempt=0
+        while True:
+            r=None
+            try:
+                r=self.request("POST", self.acct("/orders"), json=body, timeout=timeout, idempotent=False)
+                if r.ok: return r.json()
+                err=OandaError(f"place_order failed: {pretty(r)}", r)
+                if r.status_code not in RETRY_STATUS or not cid: raise err
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not cid: raise
+                err=e
+            if r is None or r.status_code!=429:  # 429 is rejected before processing; others may have landed
+                found=self.order_by_client_id(cid)
+                if found and _same_order(found, body["order"]): return {"order":found, "recovered":True, "clientID":cid}
+            if attempt>=self.retries or not self.budget.spend(): raise err
+            self._sleep(attempt, r); attempt+=1
+
+def _same_order(found, sent)->bool:
+    """A client-ID hit is only our order if instrument and units agree (IDs can collide across callers)."""
+    try: return found.get("instrument")==sent.get("instrument") and float(found.get("units"))==float(sent.get("units"))
+    except (TypeError, ValueError): return False
+
+_clients={}; _clients_lock=threading.Lock()
+def client(api, key, account, **kw)->OandaHTTP:
+    """Process-wide client per (api, key, account)."""
+    k=(api, key, account)
+    c=_clients.get(k)
+    if c is None:
+        with _clients_lock:
+            c=_clients.get(k)
+            if c is None: c=_clients[k]=OandaHTTP(api, key, account, **kw)
+    return c
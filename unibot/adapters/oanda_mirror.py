@@ -0,0 +1,141 @@
+"""
+Local mirror of one OANDA account: a single GET /accounts/{id} snapshot, then
+/changes?sinceTransactionID= deltas. Lookups (position by instrument, pending orders,
+trades, order by client ID) are dict reads.
+
+The transactions stream is only a wake-up: any transaction triggers an immediate
+/changes poll (so the mirror trails the broker by one round trip, not a poll period),
+and ORDER_FILL transactions close the matching latency trace. Without the stream the
+mirror polls every OANDA_MIRROR_POLL seconds. verify() re-downloads the snapshot,
+reports any drift and resets to it.
+"""
+import os, json, time, threading
+import requests
+from unibot.core import latency
+
+def _open(p):
+    return p.get("long",{}).get("units","0") not in ("0","0.0") or p.get("short",{}).get("units","0") not in ("0","0.0")
+
+class AccountMirror:
+    def __init__(self, http, stream_url=None, poll_secs=None, verify_secs=None):
+        self.http=http; self.stream_url=stream_url
+        self.poll_secs=float(poll_secs or os.getenv("OANDA_MIRROR_POLL","1"))
+        self.verify_secs=float(verify_secs or os.getenv("OANDA_MIRROR_VERIFY_SECS","300"))
+        self._lock=threading.RLock(); self._wake=threading.Event(); self._stop=threading.Event()
+        self.last_txn=None; self.account={}
+        self.positions={}; self.trades={}; self.orders={}; self._cid={}
+        self.stats={"polls":0, "wakeups":0, "resyncs":0, "last_poll":0.0, "last_error":None}
+        self._threads=[]
+
+    # --- snapshot / deltas ---
+    def load(self):
+        j=self.http.call("GET", self.http.acct(), "account snapshot", ttl=0)
+        with self._lock: self._reset(j["account"], j["lastTransactionID"])
+        return self
+    def _reset(self, acct, txn):
+        self.account={k:v for k,v in acct.items() if k not in ("positions","trades","orders")}
+        self.positions={p["instrument"]:p for p in acct.get("positions",[])}
+        self.trades={t["id"]:t for t in acct.get("trades",[])}
+        self.orders={}; self._cid={}
+        for o in acct.get("orders",[]): self._add_order(o)
+        self.last_txn=txn
+    def _add_order(self, o):
+        self.orders[o["id"]]=o
+        cid=(o.get("clientExtensions") or {}).get("id")
+        if cid: self._cid[cid]=o["id"]
+    def _drop_order(self, oid):
+        o=self.orders.pop(oid, None)
+        cid=(o.get("clientExtensions") or {}).get("id") if o else None
+        if cid: self._cid.pop(cid, None)
+
+    def poll(self):
+        """Apply /changes since the last seen transaction."""
+        if self.last_txn is None: return self.load()
+        j=self.http.call("GET", self.http.acct("/changes"), "account changes", params={"sinceTransactionID":self.last_txn}, ttl=0)
+        ch=j.get("changes",{}); st=j.get("state",{})
+        with self._lock:
+            for o in ch.get("ordersCreated",[]):
+                if o.get("state","PENDING")=="PENDING": self._add_order(o)
+            for k in ("ordersCancelled","ordersFilled","ordersTriggered"):
+                for o in ch.get(k,[]): self._drop_order(o["id"])
+            for t in ch.get("tradesOpened",[])+ch.get("tradesReduced",[]): self.trades[t["id"]]=t
+            for t in ch.get("tradesClosed",[]): self.trades.pop(t["id"], None)
+            for p in ch.get("positions",[]): self.positions[p["instrument"]]=p
+            for t in st.get("trades",[]):  # dynamic fields (unrealizedPL, marginUsed)
+                if t["id"] in self.trades: self.trades[t["id"]].update({k:v for k,v in t.items() if k!="id"})
+            for p in st.get("positions",[]):
+                if p["instrument"] in self.positions:
+                    self.positions[p["instrument"]].update({k:v for k,v in p.items() if k not in ("instrument","long","short")})
+            self.account.update({k:v for k,v in st.items() if k not in ("trades","positions","orders")})
+            for t in ch.get("transactions",[]):  # state has no balance; fills/closes carry it
+                if "accountBalance" in t: self.account["balance"]=t["accountBalance"]
+            self.last_txn=j.get("lastTransactionID", self.last_txn)
+        self.stats["polls"]+=1; self.stats["last_poll"]=time.time()
+        return self
+    sync=poll
+
+    def verify(self)->dict:
+        """Compare against a fresh snapshot; on drift, reset to it. Returns the drift (empty = consistent)."""
+        j=self.http.call("GET", self.http.acct(), "account snapshot", ttl=0)
+        a=j["account"]
+        want_pos={p["instrument"]:(p["long"]["units"], p["short"]["units"]) for p in a.get("positions",[]) if _open(p)}
+        want_tr={t["id"]:t.get("currentUnits") for t in a.get("trades",[])}
+        want_or={o["id"] for o in a.get("orders",[])}
+        with self._lock:
+            have_pos={i:(p["long"]["units"], p["short"]["units"]) for i,p in self.positions.items() if _open(p)}
+            have_tr={i:t.get("currentUnits") for i,t in self.trades.items()}
+            drift={}
+            if want_pos!=have_pos: drift["positions"]={"broker":want_pos, "mirror":have_pos}
+            if want_tr!=have_tr: drift["trades"]={"broker":want_tr, "mirror":have_tr}
+            if want_or!=set(self.orders): drift["orders"]={"broker":sorted(want_or), "mirror":sorted(self.orders)}
+            if drift: self._reset(a, j["lastTransactionID"]); self.stats["resyncs"]+=1
+        return drift
+
+    # --- O(1) reads ---
+    def position(self, instrument)->dict:
+        p=self.positions.get(instrument); return p if p and _open(p) else {}
+    def open_positions(self)->list:
+        with self._lock: return [p for p in self.positions.values() if _open(p)]
+    def pending_orders(self, instrument=None)->list:
+        with self._lock: return [o for o in self.orders.values() if instrument is None or o.get("instrument")==instrument]
+    def trades_for(self, instrument)->list:
+        with self._lock: return [t for t in self.trades.values() if t.get("instrument")==instrument]
+    def order_by_client_id(self, cid):
+        oid=self._cid.get(cid); return self.orders.get(oid) if oid else None
+
+    # --- background ---
+    def start(self):
+        if self.last_txn is None: self.load()
+        self._threads=[threading.Thread(target=self._poll_loop, name="oanda-mirror", daemon=True)]
+        if self.stream_url: self._threads.append(threading.Thread(target=self._stream_loop, name="oanda-txn-stream", daemon=True))
+        for t in self._threads: t.start()
+        return self
+    def stop(self):
+        self._stop.set(); self._wake.set()
+    def _poll_loop(self):
+        last_verify=time.time()
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_secs); self._wake.clear()
+            if self._stop.is_set(): break
+            try:
+                self.poll()
+                if self.verify_secs and time.time()-last_verify>=self.verify_secs:
+                    last_verify=time.time(); self.verify()
+            except Exception as e: self.stats["last_error"]=repr(e)
+    def _stream_loop(self):
+        url=f"{self.stream_url.rstrip('/')}{self.http.acct('/transactions/stream')}"
+        backoff=0.5
+        while not self._stop.is_set():
+            try:
+                with self.http.session.get(url, stream=True, timeout=(5.0, 15.0)) as r:
+                    r.raise_for_status(); backoff=0.5
+                    for line in r.iter_lines(chunk_size=None):
+                        if self._stop.is_set(): return
+                        if not line: continue
+                        m=json.loads(line)
+                        if m.get("type")=="HEARTBEAT": continue
+                        if m.get("type")=="ORDER_FILL" and m.get("clientOrderID"): latency.fill(m["clientOrderID"])
+                        self.stats["wakeups"]+=1; self._wake.set()
+            except (requests.RequestException, ValueError) as e:
+                self.stats["last_error"]=repr(e)
+            self._stop.wait(backoff); backoff=min(30.0, backoff*2)
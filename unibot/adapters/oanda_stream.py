@@ -0,0 +1,101 @@
+"""
+OANDA pricing-stream consumer: one background connection keeps the last bid / ask /
+mid per instrument in memory, so price() is a dict read instead of a candles GET.
+
+The v3 stream sends a HEARTBEAT every 5 s; if nothing (price or heartbeat) arrives for
+OANDA_STREAM_HB_TIMEOUT seconds the connection is treated as dead and re-opened with
+jittered exponential backoff. Subscribing a new instrument re-opens the stream.
+
+  python tools/oanda_stream_standin.py --port 8765   # local chunked-HTTP stand-in
+  OANDA_STREAM_URL=http://127.0.0.1:8765 ...
+"""
+import os, json, time, random, threading
+import requests
+
+class StalePrice(RuntimeError):
+    pass
+
+class PriceStream:
+    def __init__(self, stream_url, key, account, instruments=(), hb_timeout=None, max_backoff=30.0):
+        self.url=f"{stream_url.rstrip('/')}/v3/accounts/{account}/pricing/stream"
+        self.hb_timeout=float(hb_timeout or os.getenv("OANDA_STREAM_HB_TIMEOUT","10"))
+        self.max_backoff=max_backoff
+        self.session=requests.Session()
+        self.session.headers.update({"Authorization":f"Bearer {key}", "Accept-Datetime-Format":"RFC3339"})
+        self._want=set(instruments); self._lock=threading.Lock()
+        self._quotes={}   # ins -> (bid, ask, mid, broker_time, monotonic receive time)
+        self._stop=threading.Event(); self._ready=threading.Event(); self._resp=None; self._thread=None
+        self.stats={"connects":0, "reconnects":0, "prices":0, "heartbeats":0, "last_msg":0.0, "last_error":None}
+
+    # --- reads ---
+    def quote(self, ins, max_age=None):
+        """(bid, ask, mid, broker_time) or None if unknown / older than max_age seconds."""
+        q=self._quotes.get(ins)
+        if q is None or (max_age is not None and time.monotonic()-q[4]>max_age): return None
+        return q[:4]
+    def price(self, ins, max_age=5.0)->float:
+        q=self.quote(ins, max_age)
+        if q is None: raise StalePrice(f"{ins}: no streamed price within {max_age}s")
+        return q[2]
+    def healthy(self)->bool:
+        return self._ready.is_set() and time.monotonic()-self.stats["last_msg"]<self.hb_timeout
+
+    # --- subscription / lifecycle ---
+    def subscribe(self, *instruments):
+        with self._lock:
+            new=set(instruments)-self._want
+            if not new: return
+            self._want|=new
+        self._kick()
+    def start(self):
+        if self._thread is None:
+            self._thread=threading.Thread(target=self._run, name="oanda-pricing", daemon=True); self._thread.start()
+        return self
+    def wait_ready(self, timeout=None)->bool: return self._ready.wait(timeout)
+    def stop(self):
+        self._stop.set(); self._kick()
+        if self._thread: self._thread.join(timeout=5)
+    def _kick(self):
+        r=self._resp  # closing the response unblocks iter_lines; _run reconnects with the new set
+        if r is not None:
+            try: r.close()
+            except Exception: pass
+
+    def _run(self):
+        backoff=0.5
+        while not self._stop.is_set():
+            with self._lock: want=frozenset(self._want)
+            if not want:
+                self._stop.wait(0.2); continue
+            seen=self.stats["last_msg"]; err=None
+            try: self._consume(want)
+            except Exception as e: err=e
+            if self._stop.is_set(): break
+            if self.stats["last_msg"]>seen: backoff=0.5  # the connection delivered data
+            self._ready.clear(); self.stats["reconnects"]+=1
+            with self._lock: resub=self._want!=want
+            if not resub:  # lost or stalled connection: back off before re-opening
+                if err is not None: self.stats["last_error"]=repr(err)
+                self._stop.wait(random.uniform(0, backoff)); backoff=min(self.max_backoff, backoff*2)
+
+    def _consume(self, want):
+        r=self.session.get(self.url, params={"instruments":",".join(sorted(want))}, stream=True,
+                           timeout=(5.0, self.hb_timeout))
+        self._resp=r
+        try:
+            r.raise_for_status()
+            self.stats["connects"]+=1
+            for line in r.iter_lines(chunk_size=None):
+                if self._stop.is_set() or self._want!=want: return
+                if not line: continue
+                m=json.loads(line); now=time.monotonic(); self.stats["last_msg"]=now
+                t=m.get("type")
+                if t=="PRICE":
+                    bid=float(m["bids"][0]["price"]) if m.get("bids") else float(m["closeoutBid"])
+                    ask=float(m["asks"][0]["price"]) if m.get("asks") else float(m["closeoutAsk"])
+                    self._quotes[m["instrument"]]=(bid, ask, (bid+ask)/2, m.get("time"), now)
+                    self.stats["prices"]+=1; self._ready.set()
+                elif t=="HEARTBEAT":
+                    self.stats["heartbeats"]+=1; self._ready.set()
+        finally:
+            self._resp=None; r.close()
@@ -0,0 +1,40 @@
+"""
+Long-lived broker adapters, one per backend per process.
+
+get_broker() resolves the adapter class at call time, so the replay's SIM
+monkeypatch of unibot.adapters.oanda is honoured. Call warm() at process startup
+(router.warm_up() does) so the keep-alive pool is open before the first signal;
+an adapter first created by an order instead warms in the background
+(OANDA_WARM connections, 0 disables).
+"""
+import os, sys, threading, importlib
+
+_MODULES={"oanda":("unibot.adapters.oanda","Oanda"),
+          "oanda_async":("unibot.adapters.oanda_async","OandaSync")}  # blocking facade over the asyncio adapter
+_instances={}; _lock=threading.Lock()
+
+def _warm_n(n=None)->int:
+    return int(os.getenv("OANDA_WARM", "2")) if n is None else int(n)
+
+def get_broker(name:str="oanda", warm:bool=True):
+    modname, attr=_MODULES[name]
+    cls=getattr(sys.modules.get(modname) or importlib.import_module(modname), attr)
+    b=_instances.get(name)
+    if b is not None and type(b) is cls: return b
+    with _lock:
+        b=_instances.get(name)
+        if b is None or type(b) is not cls:
+            b=_instances[name]=cls()
+            n=_warm_n()
+            if warm and n>0 and hasattr(b, "warm"):
+                threading.Thread(target=b.warm, args=(n,), name=f"{name}-warm", daemon=True).start()
+    return b
+
+def warm(name:str="oanda", n:int=None)->int:
+    """Create the adapter and open n pooled connections now, blocking; returns how many succeeded."""
+    b=get_broker(name, warm=False); n=_warm_n(n)
+    return b.warm(n) if n>0 and hasattr(b, "warm") else 0
+
+def reset():
+    """Drop cached adapters (config change, tests)."""
+    with _lock: _instances.clear()
@@ -0,0 +1,106 @@
+"""
+Per-account request scheduler shared by everything that talks to one OANDA account.
+
+- token bucket (OANDA_RATE req/s, OANDA_BURST) with strict priorities: a waiting
+  ORDER call is always served before ACCOUNT / STATUS calls, and STATUS calls
+  cannot dip into the last OANDA_ORDER_RESERVE tokens (capped at burst-1), so
+  monitoring never starves order flow
+- single-flight GETs: identical GETs already in flight share the first caller's response
+- short TTL cache of successful GETs (OANDA_GET_TTL seconds), dropped on any write
+for_account() hands out one scheduler per (api, account), so the blocking client and
+the asyncio adapter draw from the same bucket.
+"""
+import os, time, heapq, itertools, threading
+
+ORDER, ACCOUNT, STATUS = 0, 1, 2
+NAMES = {ORDER:"order", ACCOUNT:"account", STATUS:"status"}
+
+def classify(method, path)->int:
+    """Default priority: writes and order lookups > account state > prices / status."""
+    if method!="GET" or "/orders/@" in path: return ORDER
+    if "/pricing" in path or "/candles" in path: return STATUS
+    return ACCOUNT
+
+class _Flight:
+    __slots__=("done","resp","err")
+    def __init__(self): self.done=threading.Event(); self.resp=None; self.err=None
+
+class RequestScheduler:
+    def __init__(self, rate=None, burst=None, reserve=None, ttl=None):
+        self.rate=float(rate or os.getenv("OANDA_RATE","50"))
+        self.burst=max(1.0, float(burst or os.getenv("OANDA_BURST", str(self.rate))))  # a bucket must hold one token
+        reserve=float(reserve if reserve is not None else os.getenv("OANDA_ORDER_RESERVE", str(max(1.0, self.burst*0.2))))
+        self.reserve=min(max(0.0, reserve), self.burst-1.0)  # STATUS needs reserve+1 tokens; keep that reachable
+        self.ttl=float(ttl if ttl is not None else os.getenv("OANDA_GET_TTL","0.25"))
+        self.tokens=self.burst; self._t=time.monotonic()
+        self._cv=threading.Condition(); self._waiters=[]; self._seq=itertools.count()
+        self._flights={}; self._cache={}; self._fl_lock=threading.Lock()
+        self.stats={"granted":[0,0,0], "waited_s":[0.0,0.0,0.0], "coalesced":0, "cache_hits":0}
+
+    # --- token bucket ---
+    def _refill(self, now):
+        self.tokens=min(self.burst, self.tokens+(now-self._t)*self.rate); self._t=now
+    def acquire(self, prio=ACCOUNT):
+        t0=time.monotonic(); me=(prio, next(self._seq))
+        floor=self.reserve if prio==STATUS else 0.0
+        with self._cv:
+            heapq.heappush(self._waiters, me)
+            while True:
+                now=time.monotonic(); self._refill(now)
+                if self._waiters[0]==me and self.tokens-1.0>=floor-1e-9:
+                    heapq.heappop(self._waiters); self.tokens-=1.0; self._cv.notify_all(); break
+                need=max(1.0+floor-self.tokens, 0.0)
+                self._cv.wait(max(need/self.rate, 0.001) if self._waiters[0]==me else 0.05)
+        self.stats["granted"][prio]+=1; self.stats["waited_s"][prio]+=time.monotonic()-t0
+    def try_acquire(self, prio=ACCOUNT)->bool:
+        """Take a token without waiting; False if one is not free or a caller is already queued."""
+        floor=self.reserve if prio==STATUS else 0.0
+        with self._cv:
+            self._refill(time.monotonic())
+            if self._waiters or self.tokens-1.0<floor-1e-9: return False
+            self.tokens-=1.0
+        self.stats["granted"][prio]+=1
+        return True
+
+    # --- GET coalescing + cache ---
+    def get(self, key, fetch, ttl=None):
+        """fetch() once for concurrent identical keys; cache ok responses for ttl seconds."""
+        ttl=self.ttl if ttl is None else ttl
+        with self._fl_lock:
+            hit=self._cache.get(key)
+            if hit and hit[0]>time.monotonic():
+                self.stats["cache_hits"]+=1; return hit[1]
+            fl=self._flights.get(key); leader=fl is None
+            if leader: fl=self._flights[key]=_Flight()
+            else: self.stats["coalesced"]+=1
+        if not leader:
+            fl.done.wait()
+            if fl.err is not None: raise fl.err
+            return fl.resp
+        try:
+            fl.resp=fetch()
+            if ttl>0 and getattr(fl.resp, "ok", False):
+                with self._fl_lock: self._cache[key]=(time.monotonic()+ttl, fl.resp)
+            return fl.resp
+        except BaseException as e:
+            fl.err=e; raise
+        finally:
+            with self._fl_lock: self._flights.pop(key, None)
+            fl.done.set()
+
+    def invalidate(self):
+        with self._fl_lock: self._cache.clear()
+
+    def summary(self)->dict:
+        return {"tokens":round(self.tokens,2), "coalesced":self.stats["coalesced"], "cache_hits":self.stats["cache_hits"],
+                **{f"{NAMES[p]}_granted":self.stats["granted"][p] for p in NAMES},
+                **{f"{NAMES[p]}_wait_ms":round(self.stats["waited_s"][p]*1e3/max(1,self.stats["granted"][p]),3) for p in NAMES}}
+
+_shared={}; _shared_lock=threading.Lock()
+def for_account(api, account)->RequestScheduler:
+    """Process-wide scheduler for one account (OANDA limits are per account, not per client)."""
+    k=(api.rstrip("/"), account)
+    with _shared_lock:
+        s=_shared.get(k)
+        if s is None: s=_shared[k]=RequestScheduler()
+    return s
@@ -0,0 +1,57 @@
+"""
+Asyncio front end for one_shot_entry: entries for different symbols go out
+concurrently, entries for the same symbol queue behind a per-symbol lock, so the
+guard's no-pyramiding / cooldown checks always see the previous entry's outcome.
+
+  ROUTER_CONCURRENCY     orders in flight at once (8)
+  ROUTER_TIMEOUT_SECS    per-order wait before returning status=timeout (20)
+
+A timed-out order may still reach the broker; its symbol stays locked until the
+worker thread returns, and the result carries the cid for reconciliation.
+"""
+import os, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from . import router
+
+class AsyncRouter:
+    def __init__(self, max_concurrency:int=None, timeout:float=None):
+        self.max_concurrency=int(max_concurrency or os.getenv("ROUTER_CONCURRENCY","8"))
+        self.timeout=float(timeout or os.getenv("ROUTER_TIMEOUT_SECS","20"))
+        self._pool=ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="router")
+        self._sem=asyncio.Semaphore(self.max_concurrency)
+        self._locks={}
+
+    async def start(self, broker:str="oanda")->int:
+        """Warm the broker's connection pool before the first entry (call once at startup)."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, router.warm_up, broker)
+
+    def _lock(self, symbol):
+        k=symbol.replace("/","_")
+        lk=self._locks.get(k)
+        if lk is None: lk=self._locks[k]=asyncio.Lock()
+        return lk
+
+    async def entry(self, symbol:str, side:str, units:int, price:float, pip_val:float,
+                    open_count:int=0, last_fill:float|None=None, cid:str|None=None)->dict:
+        cid=cid or router.new_cid(); lock=self._lock(symbol)
+        await lock.acquire(); held=True
+        try:
+            async with self._sem:
+                fut=asyncio.get_running_loop().run_in_executor(self._pool, partial(
+                    router.one_shot_entry, symbol, side, units, price, pip_val, open_count, last_fill, cid))
+                try:
+                    return await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+                except asyncio.TimeoutError:
+                    fut.add_done_callback(lambda _: lock.release()); held=False
+                    return {"status":"timeout", "cid":cid, "symbol":symbol, "timeout":self.timeout}
+                except Exception as e:
+                    return {"status":"error", "cid":cid, "symbol":symbol, "error":str(e)}
+        finally:
+            if held: lock.release()
+
+    async def entries(self, signals)->list:
+        """signals: iterable of entry() kwargs dicts; results come back in the same order."""
+        return await asyncio.gather(*(self.entry(**s) for s in signals))
+
+    def close(self): self._pool.shutdown(wait=False)
@@ -0,0 +1,113 @@
+"""
+Order-path latency: one Trace per client ID, stage spans into per-(symbol, stage)
+log-bucket histograms, exported as JSON or Prometheus text.
+
+Marks (perf_counter seconds) after the origin (signal evaluation start); each
+stage's span is the time since the previous mark:
+  signal  signal handed to the router
+  guard   guard decision made
+  send    order request handed to the HTTP client
+  ack     broker response received
+  fill    fill transaction seen (market fills arrive with the ack)
+plus "total" from the first to the last mark. Each stage is recorded once and nothing
+after the trace is done; a fill seen before the ack (the transactions stream can beat
+the POST response) is held and recorded right after the ack.
+"""
+import math, time, json, threading
+from collections import OrderedDict
+
+STAGES=("signal","guard","send","ack","fill")
+_GROWTH=2**0.125           # ~9% bucket width -> quantile error < 5%
+_MIN=1e-6                  # 1 us floor
+_NB=int(math.log(1e3/_MIN, _GROWTH))+2   # up to ~1000 s
+
+class Histogram:
+    __slots__=("counts","count","sum","max")
+    def __init__(self):
+        self.counts=[0]*_NB; self.count=0; self.sum=0.0; self.max=0.0
+    def observe(self, secs):
+        b=0 if secs<=_MIN else min(_NB-1, int(math.log(secs/_MIN, _GROWTH))+1)
+        self.counts[b]+=1; self.count+=1; self.sum+=secs
+        if secs>self.max: self.max=secs
+    def quantile(self, q):
+        if not self.count: return 0.0
+        rank=q*self.count; seen=0
+        for b,c in enumerate(self.counts):
+            seen+=c
+            if seen>=rank: return min(self.max, _MIN*_GROWTH**b)  # bucket upper bound
+        return self.max
+
+class Registry:
+    def __init__(self):
+        self._h={}; self._lock=threading.Lock()
+    def observe(self, symbol, stage, secs):
+        with self._lock:
+            h=self._h.get((symbol,stage))
+            if h is None: h=self._h[(symbol,stage)]=Histogram()
+            h.observe(secs)
+    def summary(self):
+        with self._lock: items=sorted(self._h.items())
+        out={}
+        for (sym,stage),h in items:
+            out.setdefault(sym,{})[stage]={"count":h.count, "mean":h.sum/h.count, "max":h.max,
+                "p50":h.quantile(0.5), "p99":h.quantile(0.99), "p999":h.quantile(0.999)}
+        return out
+    def to_json(self, path=None):
+        s=json.dumps(self.summary(), indent=2)
+        if path:
+            with open(path,"w") as f: f.write(s)
+        return s
+    def to_prometheus(self, name="unibot_order_latency_seconds"):
+        lines=[f"# HELP {name} Order path stage latency by symbol.", f"# TYPE {name} summary"]
+        for sym,stages in self.summary().items():
+            for stage,v in stages.items():
+                lab=f'symbol="{sym}",stage="{stage}"'
+                for q,k in ((0.5,"p50"),(0.99,"p99"),(0.999,"p999")):
+                    lines.append(f'{name}{{{lab},quantile="{q}"}} {v[k]:.9f}')
+                lines.append(f"{name}_sum{{{lab}}} {v['mean']*v['count']:.9f}")
+                lines.append(f"{name}_count{{{lab}}} {v['count']}")
+        return "\n".join(lines)+"\n"
+
+REGISTRY=Registry()
+
+class Trace:
+    __slots__=("cid","symbol","marks","done","early_fill","lock")
+    def __init__(self, cid, symbol, t0=None):
+        self.cid=cid; self.symbol=symbol; self.marks=[("origin", time.perf_counter() if t0 is None else t0)]; self.done=False
+        self.early_fill=None; self.lock=threading.Lock()  # marks come from the router and the stream thread
+    def mark(self, stage, t=None):
+        t=time.perf_counter() if t is None else t
+        with self.lock:
+            if self.done or any(s==stage for s,_ in self.marks): return t
+            if stage=="fill" and not any(s=="ack" for s,_ in self.marks):
+                if self.early_fill is None: self.early_fill=t
+                return t
+            self._observe(stage, t)
+            if stage=="ack" and self.early_fill is not None: stage="fill"; self._observe("fill", max(t, self.early_fill))
+        if stage=="fill": self.finish()
+        return t
+    def _observe(self, stage, t):
+        REGISTRY.observe(self.symbol, stage, max(0.0, t-self.marks[-1][1]))
+        self.marks.append((stage,t))
+    def finish(self):
+        if self.done: return
+        self.done=True
+        with _open_lock: _open.pop(self.cid, None)
+        if len(self.marks)>1: REGISTRY.observe(self.symbol, "total", self.marks[-1][1]-self.marks[0][1])
+    def spans(self):
+        return {s:t-self.marks[i-1][1] for i,(s,t) in enumerate(self.marks) if i}
+
+_open=OrderedDict(); _open_lock=threading.Lock(); _MAX_OPEN=10000  # traces waiting for a fill
+
+def start(cid, symbol, t0=None)->Trace:
+    tr=Trace(cid, symbol, t0); stale=[]
+    with _open_lock:
+        _open[cid]=tr
+        while len(_open)>_MAX_OPEN: stale.append(_open.popitem(last=False)[1])
+    for old in stale: old.finish()  # fill never seen: keep its total up to the ack
+    return tr
+
+def fill(cid, t=None):
+    """Record the fill for an order acked earlier (e.g. from the transactions stream)."""
+    tr=_open.get(cid)
+    if tr: tr.mark("fill", t)
@@ -1,33 +1,101 @@
 import time, uuid, os
+from concurrent.futures import ThreadPoolExecutor
 try:
     from guards.sniper_gate import guard_place_order, record_fill
     _HAS_GUARD=True
 except Exception:
     _HAS_GUARD=False
+    COOLDOWN_SECS=30*60
     def guard_place_order(symbol, side, units, price, pip_value, open_positions_for_symbol, last_fill_price=None, tp=None, sl=None):
         # ultra-minimal fallback: enforce no pyramiding + 30m cooldown + ensure TP/SL present
-        cd_path=f"state/{symbol.replace('/','_')}.cooldown"
-        import json, pathlib, time
-        pathlib.Path("state").mkdir(exist_ok=True)
-        now=time.time(); last=0.0
-        if os.path.exists(cd_path):
-            try: last=float(open(cd_path).read().strip())
-            except: pass
+        st=get_state()  # in-memory, write-behind to state/router.sqlite
         if open_positions_for_symbol>0: return False, {"reason":"no-pyramiding"}
-        if now-last<30*60: return False, {"reason":f"cooldown: {int((30*60-(now-last))//60)}m remaining"}
+        left=st.cooldown_remaining(symbol, COOLDOWN_SECS)
+        if left>0: return False, {"reason":f"cooldown: {int(left//60)}m remaining"}
         if tp is None or sl is None: return False, {"reason":"tp/sl required"}
-        open(cd_path,"w").write(str(now))
+        if not st.claim(symbol, COOLDOWN_SECS): return False, {"reason":"cooldown: claimed concurrently"}
         return True, {"tp":tp,"sl":sl}
-    def record_fill(symbol, fill_price): pass
+    def record_fill(symbol, fill_price): get_state().record_fill(symbol, fill_price)
+    def record_close(symbol): get_state().record_close(symbol)
 
-from unibot.adapters.oanda import Oanda
+from unibot.adapters.registry import get_broker
+from unibot.core import latency
+from unibot.core.state import get_state
+
+def warm_up(broker:str="oanda", n:int|None=None)->int:
+    """Process-startup hook: build the broker adapter and open its connections before the first signal."""
+    from unibot.adapters import registry
+    return registry.warm(broker, n)
+
+def new_cid()->str:
+    return f"rbot-{int(time.time())}-{uuid.uuid4().hex[:8]}"
 
 def one_shot_entry(symbol:str, side:str, units:int, price:float, pip_val:float,
-                   open_count:int=0, last_fill:float|None=None):
+                   open_count:int=0, last_fill:float|None=None, cid:str|None=None, signal_t:float|None=None):
+    """signal_t: time.perf_counter() when signal evaluation began (latency trace origin)."""
+    cid = cid or new_cid()
+    tr = latency.start(cid, symbol, signal_t); tr.mark("signal")
     ok, params = guard_place_order(symbol, side, units, price, pip_val, open_count, last_fill)
-    if not ok: return {"status":"blocked", "reason":params["reason"], "guard":("real" if _HAS_GUARD else "fallback")}
-    broker = Oanda()
-    cid = f"rbot-{int(time.time())}-{uuid.uuid4().hex[:8]}"
-    resp = broker.place_order_oco(symbol, side, units, price, params["tp"], params["sl"], client_id=cid)
+    tr.mark("guard")
+    if not ok:
+        tr.finish()
+        return {"status":"blocked", "reason":params["reason"], "guard":("real" if _HAS_GUARD else "fallback")}
+    return _place(symbol, side, units, price, params, cid, tr)
+
+def _place(symbol, side, units, price, params, cid, tr)->dict:
+    broker = get_broker()  # pooled, long-lived adapter
+    tr.mark("send")
+    try: resp = broker.place_order_oco(symbol, side, units, price, params["tp"], params["sl"], client_id=cid)
+    except Exception:
+        tr.finish(); raise
+    t = tr.mark("ack")
+    if isinstance(resp, dict) and "orderFillTransaction" in resp: tr.mark("fill", t)
     record_fill(symbol, price)
     return {"status":"placed", "cid":cid, "resp":resp, "guard":("real" if _HAS_GUARD else "fallback")}
+
+_pool=None
+def _dispatch_pool():
+    global _pool
+    if _pool is None: _pool=ThreadPoolExecutor(int(os.getenv("ROUTER_CONCURRENCY","8")), thread_name_prefix="router")
+    return _pool
+
+def _open_total()->int|None:
+    """Open positions across the account, from the broker (None if it cannot say)."""
+    try: return len(get_broker().open_positions())
+    except Exception: return None
+
+def batch_entry(signals:list, max_open:int|None=None)->list:
+    """
+    Guard a whole bar's signals in one pass, then send the accepted orders concurrently.
+    signals: dicts with one_shot_entry's arguments (symbol, side, units, price, pip_val,
+    optional open_count, last_fill, tp, sl, cid, signal_t). A later signal for a symbol
+    already in the batch is rejected as a duplicate; max_open (ROUTER_MAX_OPEN, 0 = off)
+    caps open positions across all symbols, counting this batch's accepted entries; the
+    open count comes from the broker (account mirror when enabled), and if it cannot be
+    read every signal is blocked. Returns one result per signal, in order.
+    """
+    cap = int(os.getenv("ROUTER_MAX_OPEN","0")) if max_open is None else max_open
+    open_total = _open_total() if cap else 0
+    guard = "real" if _HAS_GUARD else "fallback"
+    out = [None]*len(signals); seen = set(); jobs = []
+    for i, sg in enumerate(signals):
+        sym = sg["symbol"]; key = sym.replace("/","_")
+        cid = sg.get("cid") or new_cid()
+        if key in seen:
+            out[i] = {"status":"blocked", "reason":"duplicate-in-batch", "cid":cid, "guard":guard}; continue
+        seen.add(key)
+        if cap and (open_total is None or open_total+len(jobs) >= cap):
+            why = f"max-open: {cap}" if open_total is not None else f"max-open: {cap} (open count unavailable)"
+            out[i] = {"status":"blocked", "reason":why, "cid":cid, "guard":guard}; continue
+        tr = latency.start(cid, sym, sg.get("signal_t")); tr.mark("signal")
+        ok, params = guard_place_order(sym, sg["side"], sg["units"], sg["price"], sg["pip_val"],
+                                       sg.get("open_count",0), sg.get("last_fill"), tp=sg.get("tp"), sl=sg.get("sl"))
+        tr.mark("guard")
+        if not ok:
+            tr.finish(); out[i] = {"status":"blocked", "reason":params["reason"], "cid":cid, "guard":guard}; continue
+        jobs.append((i, (sym, sg["side"], sg["units"], sg["price"], params, cid, tr)))
+    futs = [(i, a[5], _dispatch_pool().submit(_place, *a)) for i, a in jobs]
+    for i, cid, f in futs:
+        try: out[i] = f.result()
+        except Exception as e: out[i] = {"status":"error", "error":str(e), "cid":cid, "guard":guard}
+    return out
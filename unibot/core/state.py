@@ -0,0 +1,141 @@
+"""
+Router state: per-symbol last-entry time (cooldown), open count and last fill price.
+
+Reads and guard decisions are served from memory. A background thread writes dirty
+symbols to one SQLite file (WAL) and pulls in rows written by other processes.
+Merges keep the latest entry time, so a cooldown started anywhere is never shortened.
+With strict=True, claim() also takes a BEGIN IMMEDIATE transaction, so two processes
+cannot both open the same symbol inside one cooldown (this costs one fsync per entry).
+
+  ROUTER_STATE_PATH      state/router.sqlite
+  ROUTER_STATE_FLUSH     write-behind / refresh interval, seconds (0.5)
+  ROUTER_STATE_STRICT    1 = cross-process atomic claims
+"""
+import os, glob, time, atexit, sqlite3, threading
+
+_SCHEMA="""CREATE TABLE IF NOT EXISTS router_state(
+  symbol TEXT PRIMARY KEY, last_entry REAL NOT NULL DEFAULT 0, open_count INTEGER NOT NULL DEFAULT 0,
+  last_fill REAL, updated REAL NOT NULL DEFAULT 0)"""
+_UPSERT="""INSERT INTO router_state(symbol,last_entry,open_count,last_fill,updated) VALUES(?,?,?,?,?)
+  ON CONFLICT(symbol) DO UPDATE SET last_entry=max(last_entry,excluded.last_entry),
+  open_count=CASE WHEN excluded.updated>=updated THEN excluded.open_count ELSE open_count END,
+  last_fill=CASE WHEN excluded.updated>=updated THEN excluded.last_fill ELSE last_fill END,
+  updated=max(updated,excluded.updated)"""
+
+def _key(symbol): return symbol.replace("/","_")  # EUR/USD and EUR_USD share one row
+
+class RouterState:
+    def __init__(self, path=None, flush_secs=None, strict=None):
+        self.path=path or os.getenv("ROUTER_STATE_PATH","state/router.sqlite")
+        self.flush_secs=float(flush_secs if flush_secs is not None else os.getenv("ROUTER_STATE_FLUSH","0.5"))
+        self.strict=strict if strict is not None else os.getenv("ROUTER_STATE_STRICT","0").lower() in ("1","true","yes")
+        self._rows={}; self._dirty=set(); self._lock=threading.Lock(); self._stop=threading.Event()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db=self._connect(); self._db.execute(_SCHEMA)
+        self._bg=self._connect(); self._io=threading.Lock()  # flush/refresh connection, never used under _lock
+        self._migrate_legacy(os.path.dirname(os.path.abspath(self.path)))
+        self.refresh()
+        self._thread=threading.Thread(target=self._loop, name="router-state", daemon=True); self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        db=sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL"); db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _row(self, symbol):
+        r=self._rows.get(symbol)
+        if r is None: r=self._rows[symbol]=[0.0, 0, None, 0.0]  # last_entry, open_count, last_fill, updated
+        return r
+
+    def _migrate_legacy(self, d):
+        # state/<SYM>.cooldown files from the old fallback guard hold the last entry epoch
+        for p in glob.glob(os.path.join(d, "*.cooldown")):
+            sym=os.path.basename(p)[:-len(".cooldown")]
+            try:
+                with open(p) as f: t=float(f.read().strip())
+            except (OSError, ValueError): continue
+            with self._lock:
+                r=self._row(sym); r[0]=max(r[0], t); self._dirty.add(sym)
+            os.replace(p, p+".migrated")
+
+    # --- reads (memory only) ---
+    def cooldown_remaining(self, symbol, cooldown_secs, now=None):
+        symbol=_key(symbol)
+        now=time.time() if now is None else now
+        r=self._rows.get(symbol)
+        return max(0.0, cooldown_secs-(now-r[0])) if r else 0.0
+    def open_count(self, symbol):
+        r=self._rows.get(_key(symbol)); return r[1] if r else 0
+    def last_fill(self, symbol):
+        r=self._rows.get(_key(symbol)); return r[2] if r else None
+
+    # --- writes ---
+    def claim(self, symbol, cooldown_secs, now=None):
+        """Start the cooldown if it has elapsed; False if another caller got there first."""
+        symbol=_key(symbol)
+        now=time.time() if now is None else now
+        with self._lock:
+            if self.cooldown_remaining(symbol, cooldown_secs, now)>0: return False
+            if self.strict:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    row=self._db.execute("SELECT last_entry FROM router_state WHERE symbol=?", (symbol,)).fetchone()
+                    if row and now-row[0]<cooldown_secs:
+                        self._db.execute("COMMIT"); self._row(symbol)[0]=row[0]; return False
+                    r=self._row(symbol); r[0]=now; r[3]=now
+                    self._db.execute(_UPSERT, (symbol, *r)); self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK"); raise
+                return True
+            r=self._row(symbol); r[0]=now; r[3]=now; self._dirty.add(symbol)
+            return True
+    def record_fill(self, symbol, price):
+        symbol=_key(symbol)
+        with self._lock:
+            r=self._row(symbol); r[1]+=1; r[2]=float(price); r[3]=time.time(); self._dirty.add(symbol)
+    def record_close(self, symbol):
+        symbol=_key(symbol)
+        with self._lock:
+            r=self._row(symbol); r[1]=max(0, r[1]-1); r[3]=time.time(); self._dirty.add(symbol)
+
+    # --- persistence ---
+    # _lock only guards the in-memory copy/merge; the disk work runs outside it so claim() never waits on I/O
+    def flush(self):
+        with self._lock:
+            if not self._dirty: return
+            rows=[(s, *self._rows[s]) for s in self._dirty]; self._dirty.clear()
+        with self._io:
+            try:
+                self._bg.execute("BEGIN")
+                try: self._bg.executemany(_UPSERT, rows); self._bg.execute("COMMIT")
+                except Exception:
+                    self._bg.execute("ROLLBACK"); raise
+            except Exception:
+                with self._lock: self._dirty.update(r[0] for r in rows)  # rewritten (with current values) next tick
+                raise
+    def refresh(self):
+        """Merge rows written by other processes into memory."""
+        with self._io:
+            rows=self._bg.execute("SELECT symbol,last_entry,open_count,last_fill,updated FROM router_state").fetchall()
+        with self._lock:
+            for sym, le, oc, lf, up in rows:
+                r=self._row(sym); r[0]=max(r[0], le)
+                if up>r[3] and sym not in self._dirty: r[1], r[2], r[3]=oc, lf, up
+    def _loop(self):
+        while not self._stop.wait(self.flush_secs):
+            try: self.flush(); self.refresh()
+            except sqlite3.Error: pass  # locked by another writer; retried next tick
+    def close(self):
+        if self._stop.is_set(): return
+        self._stop.set(); self._thread.join(timeout=2)
+        try: self.flush()
+        finally: self._bg.close(); self._db.close()
+
+_state=None; _state_lock=threading.Lock()
+def get_state():
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None: _state=RouterState()
+    return _state
@@ -1,3 +1,4 @@
+import heapq
 from dataclasses import dataclass, field
 from .instrumentation import jlog
 @dataclass
@@ -7,35 +8,59 @@ class Order:
 class Account:
     base_equity:float=10000.0; equity:float=10000.0; orders:list=field(default_factory=list)
 class SandboxBroker:
+    """
+    acc.orders keeps the full history; open orders live in self._open plus four
+    heaps keyed by exit level (LONG: TP min-heap, SL max-heap; SHORT: TP max-heap,
+    SL min-heap), so mark() only pops orders whose level the price crossed.
+    Net size and sum(entry*size) per side are kept incrementally for unrealised PnL.
+    """
     def __init__(self,symbol:str):
         self.symbol=symbol; self.acc=Account(); self._next=1
+        self._open={}; self._stale=0
+        self._tp={"LONG":[],"SHORT":[]}; self._sl={"LONG":[],"SHORT":[]}
+        self._sz={"LONG":0.0,"SHORT":0.0}; self._ntl={"LONG":0.0,"SHORT":0.0}
         jlog("broker.connectivity",symbol=symbol,ok=True,bypass="SIMULATED")
     def place_order(self,side,size,entry,tp,sl):
         if tp is None or sl is None:
             jlog("order.rejected",reason="TP/SL required"); return {"status":"REJECTED"}
         oid=self._next; self._next+=1
-        self.acc.orders.append(Order(oid,self.symbol,side,size,entry,tp,sl))
+        o=Order(oid,self.symbol,side,size,entry,tp,sl); self.acc.orders.append(o); self._index(o)
         jlog("order.placed",id=oid,side=side,size=size,entry=entry,tp=tp,sl=sl)
         conf={"order_id":oid,"status":"FILLED","avg_fill":entry}; jlog("order.confirm",**conf); return conf
+    def _index(self,o):
+        self._open[o.id]=o; self._sz[o.side]+=o.size; self._ntl[o.side]+=o.entry*o.size
+        if o.side=="LONG":
+            heapq.heappush(self._tp["LONG"],(o.tp,o.id)); heapq.heappush(self._sl["LONG"],(-o.sl,o.id))
+        else:
+            heapq.heappush(self._tp["SHORT"],(-o.tp,o.id)); heapq.heappush(self._sl["SHORT"],(o.sl,o.id))
+    def _close(self,oid,status):
+        o=self._open.pop(oid); o.status=status; self._stale+=1
+        self._sz[o.side]-=o.size; self._ntl[o.side]-=o.entry*o.size
+        if not self._open:  # flat: drop accumulated float error and stale heap entries
+            for d in (self._sz,self._ntl): d["LONG"]=d["SHORT"]=0.0
+            for d in (self._tp,self._sl): d["LONG"].clear(); d["SHORT"].clear()
+            self._stale=0
+        elif self._stale>64 and self._stale>2*len(self._open): self._rebuild()
+    def _rebuild(self):
+        for d in (self._tp,self._sl):
+            for h in d.values(): h[:]=[e for e in h if e[1] in self._open]; heapq.heapify(h)
+        self._stale=0
+    def _pop_crossed(self,h,limit,status):
+        # pops entries with key<=limit (keys are negated for max-heaps)
+        while h and h[0][0]<=limit:
+            _,oid=heapq.heappop(h)
+            if oid in self._open: self._close(oid,status)
     def mark(self,price:float):
-        for o in self.acc.orders:
-            if o.status!="OPEN": continue
-            if o.side=="LONG":
-                if price>=o.tp: o.status="CLOSED_TP"
-                elif price<=o.sl: o.status="CLOSED_SL"
-            else:
-                if price<=o.tp: o.status="CLOSED_TP"
-                elif price>=o.sl: o.status="CLOSED_SL"
-        unreal=0.0
-        for o in self.acc.orders:
-            if o.status=="OPEN":
-                mult=1.0 if o.side=="LONG" else -1.0
-                unreal+=(price-o.entry)*mult*o.size
+        if self._open:
+            self._pop_crossed(self._tp["LONG"],price,"CLOSED_TP")
+            self._pop_crossed(self._tp["SHORT"],-price,"CLOSED_TP")
+            self._pop_crossed(self._sl["LONG"],-price,"CLOSED_SL")
+            self._pop_crossed(self._sl["SHORT"],price,"CLOSED_SL")
+        sz,ntl=self._sz,self._ntl
+        unreal=(price*sz["LONG"]-ntl["LONG"])-(price*sz["SHORT"]-ntl["SHORT"])
         self.acc.equity=self.acc.base_equity+unreal
     def positions(self):
-        net=0.0
-        for o in self.acc.orders:
-            if o.status=="OPEN": net+= o.size if o.side=="LONG" else -o.size
+        net=self._sz["LONG"]-self._sz["SHORT"]
         return {"symbol":self.symbol,"net_size":net,"equity":self.acc.equity}
     def open_orders(self):
-        return [o.__dict__ for o in self.acc.orders if o.status=="OPEN"]
+        return [o.__dict__ for o in self._open.values()]
@@ -1,4 +1,5 @@
-import csv, random
+import csv, random, time, sys
+from datetime import datetime, timezone
 def load_csv(path):
     with open(path,"r",newline="") as f:
         r = csv.DictReader(f)
@@ -15,3 +16,72 @@ def synthetic(n=2000,start=1.10000,vol=0.0005):
         lo=min(o,c)*(1.0-abs(random.gauss(0,vol/2)))
         price=c
         yield {"ts":str(i),"o":o,"h":hi,"l":lo,"c":c}
+# --- binary bars: NumPy structured array in a .npy memmap (ts = epoch ms) ---
+def bar_dtype():
+    import numpy as np
+    return np.dtype([("ts","<i8"),("o","<f8"),("h","<f8"),("l","<f8"),("c","<f8")])
+def ts_ms(ts,default=0):
+    """CSV ts -> epoch ms: integers pass through, ISO-8601 (with or without Z) is parsed."""
+    if ts is None or ts=="": return default
+    if isinstance(ts,(int,float)): return int(ts)
+    s=str(ts).strip()
+    if s.lstrip("-").isdigit(): return int(s)
+    s=s.replace("Z","+00:00")
+    if "." in s:  # OANDA sends nanoseconds; fromisoformat wants <= 6 fraction digits
+        head,frac=s.split(".",1); k=len(frac)-len(frac.lstrip("0123456789"))
+        s=f"{head}.{frac[:min(k,6)]}{frac[k:]}"
+    d=datetime.fromisoformat(s)
+    if d.tzinfo is None: d=d.replace(tzinfo=timezone.utc)
+    return int(d.timestamp()*1000)
+def csv_to_bin(csv_path,out_path,chunk=1<<16):
+    """Convert the ts,open,high,low,close CSV layout into a .npy bar file; returns the bar count."""
+    from numpy.lib.format import open_memmap
+    with open(csv_path,"r",newline="") as f: n=max(0,sum(1 for line in f if line.strip())-1)
+    arr=open_memmap(out_path,mode="w+",dtype=bar_dtype(),shape=(n,))
+    with open(csv_path,"r",newline="") as f:
+        r=csv.reader(f); hdr=next(r); ix=[hdr.index(k) for k in ("open","high","low","close")]
+        its=hdr.index("ts") if "ts" in hdr else None; i=0; buf=[]
+        for row in r:
+            if not row: continue
+            buf.append((ts_ms(row[its],i) if its is not None else i,*(float(row[j]) for j in ix)))
+            if len(buf)>=chunk: arr[i-len(buf)+1:i+1]=buf; buf=[]
+            i+=1
+        if buf: arr[i-len(buf):i]=buf
+    arr.flush(); del arr
+    return n
+def load_bin(path):
+    """Memory-mapped, read-only bar array (see bar_dtype)."""
+    import numpy as np
+    return np.load(path,mmap_mode="r")
+def iter_bars(arr,chunk=1<<16):
+    """Bar dicts from a structured array, converted a chunk at a time."""
+    for i in range(0,len(arr),chunk):
+        for ts,o,h,l,c in arr[i:i+chunk].tolist():
+            yield {"ts":ts,"o":o,"h":h,"l":l,"c":c}
+class Playback:
+    """
+    Paces a bar stream: speed<=0 runs as fast as possible; otherwise bar k is
+    released at (ts_k - ts_0)/speed after start (real time x speed), using bar
+    timestamps, or `bar_seconds` per bar when timestamps are missing.
+    Deadlines are absolute, so sleep jitter does not accumulate; max_lag records
+    how far behind schedule the consumer fell.
+    """
+    def __init__(self,bars,speed=0.0,bar_seconds=None):
+        self.bars=bars; self.speed=float(speed or 0.0); self.bar_seconds=bar_seconds; self.max_lag=0.0; self.count=0
+    def __iter__(self):
+        if self.speed<=0:
+            for b in self.bars: self.count+=1; yield b
+            return
+        t0=time.monotonic(); ts0=None
+        for k,b in enumerate(self.bars):
+            if self.bar_seconds: due=k*self.bar_seconds/self.speed
+            else:
+                ts=ts_ms(b.get("ts"),k*1000); ts0=ts if ts0 is None else ts0
+                due=(ts-ts0)/1000.0/self.speed
+            wait=due-(time.monotonic()-t0)
+            if wait>0: time.sleep(wait)
+            else: self.max_lag=max(self.max_lag,-wait)
+            self.count+=1; yield b
+if __name__=="__main__":
+    if len(sys.argv)!=3: sys.exit("usage: python -m unibot.sandbox.feed IN.csv OUT.npy")
+    print(f"{csv_to_bin(sys.argv[1],sys.argv[2])} bars -> {sys.argv[2]}")
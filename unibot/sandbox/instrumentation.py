@@ -1,11 +1,110 @@
-import json, os, time, threading, pathlib
-_lock = threading.Lock()
+import json, os, sys, time, threading, pathlib, queue, atexit
+class AsyncJsonLogger:
+    """
+    Background-thread JSONL writer. emit() only enqueues a line; the worker drains
+    up to `batch` lines at a time and writes them with one write()/flush() to
+    stdout and/or `path`. policy="block" waits when the queue is full, "drop"
+    counts and discards. The file rotates to <path>.<UTC stamp> by size and/or age.
+    """
+    def __init__(self,path=None,stdout=True,maxsize=65536,policy="block",batch=1024,
+                 interval=0.2,rotate_bytes=0,rotate_secs=0):
+        if policy not in ("block","drop"): raise ValueError("policy must be 'block' or 'drop'")
+        self.path=path; self.stdout=stdout; self.policy=policy; self.batch=max(1,int(batch))
+        self.interval=interval; self.rotate_bytes=int(rotate_bytes); self.rotate_secs=float(rotate_secs)
+        self.q=queue.Queue(maxsize=int(maxsize)); self.dropped=0; self.written=0
+        self._f=None; self._opened=0.0; self._size=0; self._closed=False
+        self._t=threading.Thread(target=self._run,name="jlog-writer",daemon=True); self._t.start()
+    def emit(self,line):
+        if self.policy=="block": self.q.put(line); return
+        try: self.q.put_nowait(line)
+        except queue.Full: self.dropped+=1
+    def flush(self,timeout=None):
+        """Block until every line emitted before this call has been written."""
+        if not self._t.is_alive(): return
+        done=threading.Event(); self.q.put(done); done.wait(timeout)
+    def close(self):
+        if self._closed: return
+        self.flush(); self._closed=True; self.q.put(None); self._t.join(5)
+        if self._f: self._f.close(); self._f=None
+    def _open(self):
+        pathlib.Path(os.path.dirname(self.path) or ".").mkdir(parents=True,exist_ok=True)
+        self._f=open(self.path,"a",encoding="utf-8"); self._opened=time.time(); self._size=self._f.tell()
+    def _rotate_if_due(self,n):
+        if self._f is None: self._open()
+        due=(self.rotate_bytes and self._size+n>self.rotate_bytes and self._size>0) or \
+            (self.rotate_secs and time.time()-self._opened>=self.rotate_secs)
+        if not due: return
+        self._f.close(); base=dst=f"{self.path}.{time.strftime('%Y%m%dT%H%M%S',time.gmtime())}"; k=1
+        while os.path.exists(dst): dst=f"{base}~{k}"; k+=1
+        os.replace(self.path,dst); self._open()
+    def _write(self,lines):
+        data="\n".join(lines)+"\n"
+        if self.stdout: sys.stdout.write(data); sys.stdout.flush()
+        if self.path:
+            self._rotate_if_due(len(data)); self._f.write(data); self._f.flush(); self._size+=len(data)
+        self.written+=len(lines)
+    def _run(self):
+        while True:
+            try: item=self.q.get(timeout=self.interval)
+            except queue.Empty: continue
+            lines=[]; marks=[]; stop=False
+            while True:
+                if item is None: stop=True
+                elif isinstance(item,threading.Event): marks.append(item)
+                else: lines.append(item)
+                if stop or len(lines)>=self.batch: break
+                try: item=self.q.get_nowait()
+                except queue.Empty: break
+            if lines:
+                try: self._write(lines)
+                except Exception as e: sys.stderr.write(f"jlog writer error: {e}\n")
+            for m in marks: m.set()
+            if stop: return
+class QueueLogger:
+    """Worker-process logger: hands encoded lines to a multiprocessing queue drained by the parent."""
+    def __init__(self,q): self.q=q
+    def emit(self,line): self.q.put(line)
+    def flush(self,timeout=None): pass
+    def close(self): pass
+_logger=None
+_lock=threading.Lock()
+_ctx={}
+def configure(**kw):
+    """Replace the process logger (kwargs as AsyncJsonLogger); the old one is flushed and closed."""
+    global _logger
+    with _lock:
+        old=_logger; _logger=AsyncJsonLogger(**kw)
+    if old: old.close()
+    return _logger
+def forward_to(q):
+    """Route this process's jlog() output into `q` (see orchestrator._pump)."""
+    global _logger
+    _logger=QueueLogger(q); return _logger
+def bind(**ctx):
+    """Fields added to every record from this process (e.g. symbol / param-set tags)."""
+    _ctx.update(ctx)
+def get_logger():
+    global _logger
+    if _logger is None:
+        with _lock:
+            if _logger is None:
+                e=os.environ
+                _logger=AsyncJsonLogger(path=e.get("LOG_FILE") or None,
+                    stdout=e.get("LOG_STDOUT","1").lower() not in ("0","false","no"),
+                    maxsize=int(e.get("LOG_QUEUE_MAX","65536")),policy=e.get("LOG_POLICY","block"),
+                    batch=int(e.get("LOG_BATCH","1024")),rotate_bytes=int(e.get("LOG_ROTATE_BYTES","0")),
+                    rotate_secs=float(e.get("LOG_ROTATE_SECS","0")))
+    return _logger
+def flush(timeout=None):
+    if _logger: _logger.flush(timeout)
+atexit.register(flush)
+_encode=json.JSONEncoder(separators=(",",":")).encode
+_mode=os.getenv("MODE","SANDBOX")  # read once; set MODE before importing the sandbox
+_ts_cache=[-1,""]
+def _ts():
+    s=int(time.time())
+    if s!=_ts_cache[0]: _ts_cache[0]=s; _ts_cache[1]=time.strftime("%Y-%m-%dT%H:%M:%S",time.gmtime(s))
+    return _ts_cache[1]
 def jlog(event, **ctx):
-    rec = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
-           "event": event, "mode": os.getenv("MODE","SANDBOX"), **ctx}
-    line = json.dumps(rec, separators=(",",":"))
-    print(line, flush=True)
-    log_file = os.getenv("LOG_FILE")
-    if log_file:
-        pathlib.Path(os.path.dirname(log_file)).mkdir(parents=True, exist_ok=True)
-        with _lock, open(log_file, "a", encoding="utf-8") as f: f.write(line+"\n")
+    rec = {"ts": _ts(), "event": event, "mode": _mode, **_ctx, **ctx}
+    (_logger or get_logger()).emit(_encode(rec))
@@ -1,4 +1,6 @@
 import math
+from collections import deque
+# --- reference implementations (recompute the window on every call) ---
 def sma(v,p):
     if p<=0 or len(v)<p: return float("nan")
     return sum(v[-p:])/float(p)
@@ -17,3 +19,50 @@ def atr(ohlc,p):
         trs.append(true_range(o,h,l,pc))
     if len(trs)<p: return 0.0
     return sum(trs[-p:])/p
+# --- O(1) rolling equivalents, fed one value / bar at a time ---
+RESYNC=4096  # re-sum the window every N updates so float drift stays bounded
+class RollingSum:
+    """Window sum/mean over the last p values; mean() matches sma(v,p)."""
+    def __init__(self,p):
+        self.p=int(p); self.w=deque(); self.s=0.0; self._k=0
+    def update(self,x):
+        if self.p<=0: return
+        self.w.append(x); self.s+=x
+        if len(self.w)>self.p: self.s-=self.w.popleft()
+        self._k+=1
+        if self._k>=RESYNC: self._k=0; self.s=sum(self.w)
+    def full(self): return self.p>0 and len(self.w)>=self.p
+    def mean(self): return self.s/float(self.p) if self.full() else float("nan")
+class RollingMeanVar:
+    """Sliding-window Welford mean/sample variance; zscore() matches zscore(v,p)."""
+    def __init__(self,p):
+        self.p=int(p); self.w=deque(); self.mu=0.0; self.m2=0.0; self._k=0
+    def update(self,x):
+        if self.p<=0: return
+        w=self.w; w.append(x)
+        if len(w)<=self.p:
+            d=x-self.mu; self.mu+=d/len(w); self.m2+=d*(x-self.mu)
+        else:
+            old=w.popleft(); mu0=self.mu
+            self.mu+=(x-old)/self.p; self.m2+=(x-old)*(x-self.mu+old-mu0)
+        self._k+=1
+        if self._k>=RESYNC: self._resync()
+    def _resync(self):
+        self._k=0; n=len(self.w)
+        if not n: return
+        self.mu=sum(self.w)/n; self.m2=sum((x-self.mu)**2 for x in self.w)
+    def full(self): return len(self.w)>=self.p
+    def var(self): return self.m2/(self.p-1) if self.p>1 and self.full() else 0.0
+    def zscore(self):
+        if self.p<=1 or not self.full(): return 0.0
+        return (self.w[-1]-self.mu)/math.sqrt(max(self.var(),1e-12))
+class RollingATR:
+    """Mean true range of the last p bars; value() matches atr(ohlc,p)."""
+    def __init__(self,p):
+        self.p=int(p); self.tr=RollingSum(p); self.pc=None; self.n=0
+    def update(self,o,h,l,c):
+        if self.pc is not None: self.tr.update(true_range(o,h,l,self.pc))
+        self.pc=c; self.n+=1
+    def value(self):
+        if self.n<self.p+1 or not self.tr.full(): return 0.0
+        return self.tr.s/self.p
@@ -0,0 +1,89 @@
+"""
+UNIBOT Sandbox orchestrator: many symbols x parameter sets across a process pool,
+all events funnelled into this process's async logger, one consolidated book.
+
+  python -m unibot.sandbox.orchestrator --symbols EUR_USD,GBP_USD --params psets.json --procs 4
+"""
+import os, json, time, random, argparse, threading, multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from . import instrumentation
+from .instrumentation import jlog, flush
+from .feed import load_csv, synthetic, load_bin, iter_bars
+from .runner import params_from_env, run
+
+FX18="EUR_USD,GBP_USD,USD_JPY,USD_CHF,AUD_USD,USD_CAD,NZD_USD,EUR_JPY,GBP_JPY,EUR_GBP,EUR_CHF,AUD_JPY,CAD_JPY,CHF_JPY,EUR_AUD,EUR_CAD,GBP_CHF,NZD_JPY"
+
+def parse_args():
+    p=argparse.ArgumentParser()
+    p.add_argument("--symbols",default=os.getenv("SYMBOLS",FX18),help="comma-separated symbols")
+    p.add_argument("--params",help="JSON file: list of env-style overrides, e.g. [{\"SMA_FAST\":8},{\"SMA_FAST\":12}]")
+    p.add_argument("--csv-dir",help="directory of <SYMBOL>.npy or <SYMBOL>.csv feeds (default: synthetic)")
+    p.add_argument("--steps",type=int,default=1200)
+    p.add_argument("--procs",type=int,default=os.cpu_count() or 1)
+    p.add_argument("--snapshot-secs",type=float,default=5.0,help="book.snapshot cadence while running")
+    p.add_argument("--out",help="write the final consolidated book here (JSON)")
+    return p.parse_args()
+
+def _init_worker(q):
+    instrumentation.forward_to(q)
+
+def _job(symbol,pset,overrides,csv_dir,steps):
+    instrumentation.bind(symbol=symbol,pset=pset)
+    random.seed(f"{symbol}:{pset}")  # forked workers would otherwise share one synthetic stream
+    jlog("sandbox.start",run=os.getenv("RUN_ID"),params=overrides)
+    path=os.path.join(csv_dir,symbol) if csv_dir else None
+    if path and os.path.exists(path+".npy"): stream=iter_bars(load_bin(path+".npy"))
+    elif path: stream=load_csv(path+".csv")
+    else: stream=synthetic(steps)
+    res=run(symbol,stream,params_from_env(overrides=overrides))
+    return {**res,"pset":pset}
+
+class Book:
+    """Latest account snapshot per (symbol, pset), fed from the event stream and final results."""
+    def __init__(self):
+        self.rows={}; self.done=set(); self._lock=threading.Lock()
+    def update(self,row,final=False):
+        key=(row["symbol"],row.get("pset",0))
+        with self._lock:
+            if key in self.done and not final: return  # late stream snapshot after the job's result
+            self.rows[key]=row
+            if final: self.done.add(key)
+    def snapshot(self):
+        with self._lock: rows=list(self.rows.values())
+        net={}
+        for r in rows: net[r["symbol"]]=net.get(r["symbol"],0.0)+r["net_size"]
+        return {"runs":len(rows),"equity_total":sum(r["equity"] for r in rows),
+                "net_by_symbol":net,"open_orders":sum(r.get("open_orders",0) for r in rows),
+                "positions":sorted(rows,key=lambda r:(r["symbol"],r.get("pset",0)))}
+
+def _pump(q,book):
+    # forward every worker line to the shared logger; peek at account snapshots for the book
+    logger=instrumentation.get_logger()
+    for line in iter(q.get,None):
+        logger.emit(line)
+        if '"account.snapshot"' in line:
+            r=json.loads(line); book.update({k:r.get(k) for k in ("symbol","pset","net_size","equity","open_orders")})
+
+def main():
+    a=parse_args()
+    symbols=[s.strip() for s in a.symbols.split(",") if s.strip()]
+    psets=json.load(open(a.params)) if a.params else [{}]
+    ctx=mp.get_context("spawn" if os.name=="nt" else "fork"); q=ctx.Queue(); book=Book()
+    pump=threading.Thread(target=_pump,args=(q,book),daemon=True); pump.start()
+    jlog("orchestrator.start",symbols=len(symbols),param_sets=len(psets),procs=a.procs)
+    t0=time.time(); last=t0; errors=0
+    with ProcessPoolExecutor(max_workers=a.procs,mp_context=ctx,initializer=_init_worker,initargs=(q,)) as pool:
+        futs={pool.submit(_job,s,i,ps,a.csv_dir,a.steps):(s,i) for s in symbols for i,ps in enumerate(psets)}
+        for f in as_completed(futs):
+            try: book.update(f.result(),final=True)
+            except Exception as e:
+                errors+=1; jlog("orchestrator.job_failed",symbol=futs[f][0],pset=futs[f][1],error=str(e))
+            if a.snapshot_secs and time.time()-last>=a.snapshot_secs:
+                last=time.time(); jlog("book.snapshot",**book.snapshot())
+    q.put(None); pump.join()
+    final=book.snapshot()
+    jlog("orchestrator.done",secs=round(time.time()-t0,2),errors=errors,**final); flush()
+    if a.out:
+        with open(a.out,"w") as f: json.dump(final,f,indent=2)
+
+if __name__=="__main__": main()
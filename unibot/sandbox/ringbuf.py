@@ -0,0 +1,31 @@
+from array import array
+class BarRing:
+    """
+    Fixed-capacity OHLC history. Each column is an array('d') of 2*capacity and
+    every bar is written twice (pos and pos+capacity), so the live window is
+    always one contiguous slice and window()/closes() are zero-copy memoryviews.
+    Indexing and len() behave like the list of (o,h,l,c) tuples it replaces.
+    """
+    COLS=("o","h","l","c")
+    def __init__(self,capacity):
+        self.capacity=cap=max(1,int(capacity)); self.pos=0; self.n=0
+        self.cols={k:array("d",bytes(16*cap)) for k in self.COLS}
+    def append(self,bar):
+        p=self.pos; cap=self.capacity
+        for k,v in zip(self.COLS,bar):
+            col=self.cols[k]; col[p]=v; col[p+cap]=v
+        self.pos=(p+1)%cap
+        if self.n<cap: self.n+=1
+    def _start(self): return (self.pos-self.n)%self.capacity
+    def window(self,col):
+        s=self._start(); return memoryview(self.cols[col])[s:s+self.n]
+    def closes(self): return self.window("c")
+    def __len__(self): return self.n
+    def __getitem__(self,i):
+        if isinstance(i,slice): return [self[j] for j in range(*i.indices(self.n))]
+        if i<0: i+=self.n
+        if not 0<=i<self.n: raise IndexError("BarRing index out of range")
+        j=self._start()+i; c=self.cols
+        return (c["o"][j],c["h"][j],c["l"][j],c["c"][j])
+    def __iter__(self):
+        for i in range(self.n): yield self[i]
@@ -1,32 +1,56 @@
 import os, argparse
-from .instrumentation import jlog
-from .feed import load_csv, synthetic
-from .signals import aggregate_signal
-from .risk import fib_leverage, tp_sl_from_atr
-from .mathlib import atr
+from .instrumentation import jlog, flush
+from .feed import load_csv, synthetic, load_bin, iter_bars, Playback
+from .signals import SignalAggregator, combine_signal, detect_fvg
+from .risk import fib_leverage, tp_sl
+from .mathlib import RollingATR, sma, zscore, atr
 from .broker import SandboxBroker
+from .ringbuf import BarRing
 def parse_args():
     p=argparse.ArgumentParser()
     p.add_argument("--symbol",default=os.getenv("SYMBOL","EUR_USD"))
     p.add_argument("--csv",help="CSV with ts,open,high,low,close")
+    p.add_argument("--bin",help=".npy bar file from `python -m unibot.sandbox.feed IN.csv OUT.npy`")
     p.add_argument("--steps",type=int,default=1200)
+    p.add_argument("--seed",type=int,help="use the vectorised regime/vol-clustering generator (synth.py) with this seed")
+    p.add_argument("--speed",type=float,default=0.0,help="0 = as fast as possible, N = real time x N")
+    p.add_argument("--bar-seconds",type=float,help="bar spacing for --speed when bars carry no timestamps")
     return p.parse_args()
-def main():
-    a=parse_args(); env=os.environ
-    jlog("sandbox.start",symbol=a.symbol,run=os.getenv("RUN_ID"))
-    stream = load_csv(a.csv) if a.csv else synthetic(a.steps)
-    base=float(env.get("BASE_LEVERAGE","1")); maxlev=float(env.get("MAX_LEVERAGE","5"))
-    w_fvg=float(env.get("W_FVG","0.60")); w_mom=float(env.get("W_MOMENTUM","0.25")); w_mr=float(env.get("W_MEANREV","0.15"))
-    fvg_lb=int(env.get("FVG_LOOKBACK","50")); fast=int(env.get("SMA_FAST","10")); slow=int(env.get("SMA_SLOW","30"))
-    mr_p=int(env.get("MR_PERIOD","50")); atr_p=int(env.get("ATR_PERIOD","14"))
-    tp_m=float(env.get("TP_ATR","2.0")); sl_m=float(env.get("SL_ATR","1.2"))
-    risk=float(env.get("RISK_PER_TRADE","0.01"))
-    broker=SandboxBroker(a.symbol); ohlc=[]
+def params_from_env(env=None,overrides=None):
+    """Strategy knobs from env vars (SMA_FAST, TP_ATR, ...); `overrides` uses the same keys."""
+    env={**(os.environ if env is None else env),**{k:str(v) for k,v in (overrides or {}).items()}}
+    return dict(base=float(env.get("BASE_LEVERAGE","1")),maxlev=float(env.get("MAX_LEVERAGE","5")),
+        w_fvg=float(env.get("W_FVG","0.60")),w_mom=float(env.get("W_MOMENTUM","0.25")),w_mr=float(env.get("W_MEANREV","0.15")),
+        fvg_lb=int(env.get("FVG_LOOKBACK","50")),fast=int(env.get("SMA_FAST","10")),slow=int(env.get("SMA_SLOW","30")),
+        mr_p=int(env.get("MR_PERIOD","50")),atr_p=int(env.get("ATR_PERIOD","14")),
+        tp_m=float(env.get("TP_ATR","2.0")),sl_m=float(env.get("SL_ATR","1.2")),
+        risk=float(env.get("RISK_PER_TRADE","0.01")))
+def reference(ohlc,p):
+    """Reference signal + ATR recomputed from the ring's window (closes are a zero-copy memoryview)."""
+    cl=ohlc.closes()
+    sig=combine_signal(detect_fvg(ohlc,p["fvg_lb"]),sma(cl,p["fast"]),sma(cl,p["slow"]),zscore(cl,p["mr_p"]),p["w_fvg"],p["w_mom"],p["w_mr"])
+    return sig,atr(ohlc[-(p["atr_p"]+1):],p["atr_p"])
+def run(symbol,stream,p):
+    """
+    Drive one symbol through the sandbox; returns the final positions() snapshot.
+    SANDBOX_VERIFY_EVERY=N re-derives the signal and ATR from the bar ring every N bars
+    and logs indicator.drift when the O(1) rolling versions disagree (0 = off).
+    """
+    base,maxlev,risk=p["base"],p["maxlev"],p["risk"]; tp_m,sl_m=p["tp_m"],p["sl_m"]
+    warm=max(p["slow"],p["mr_p"],p["fvg_lb"],p["atr_p"])+3
+    broker=SandboxBroker(symbol); ohlc=BarRing(warm)  # no consumer looks back further than warm bars
+    verify=int(os.getenv("SANDBOX_VERIFY_EVERY","0"))
+    agg=SignalAggregator(p["w_fvg"],p["w_mom"],p["w_mr"],p["fvg_lb"],p["fast"],p["slow"],p["mr_p"]); ratr=RollingATR(p["atr_p"])
     for i,bar in enumerate(stream):
         o,h,l,c=bar["o"],bar["h"],bar["l"],bar["c"]; ohlc.append((o,h,l,c)); broker.mark(c)
-        if len(ohlc)<max(slow,mr_p,fvg_lb,atr_p)+3: continue
-        sig=aggregate_signal(ohlc,w_fvg,w_mom,w_mr,fvg_lb,fast,slow,mr_p)
-        aatr=atr(ohlc,atr_p); tp,sl=tp_sl_from_atr(ohlc,atr_p,tp_m,sl_m,sig["side"])
+        agg.update(o,h,l,c); ratr.update(o,h,l,c)
+        if len(ohlc)<warm: continue
+        sig=agg.signal()
+        aatr=ratr.value(); tp,sl=tp_sl(c,aatr,tp_m,sl_m,sig["side"])
+        if verify and i%verify==0:
+            ref,ratr_ref=reference(ohlc,p)
+            d=max(abs(ref["confidence"]-sig["confidence"]),abs(ratr_ref-aatr)/max(abs(ratr_ref),1e-12))
+            if d>1e-9 or ref["side"]!=sig["side"]: jlog("indicator.drift",bar=i,drift=d,side=sig["side"],ref_side=ref["side"])
         equity=broker.positions()["equity"]; dist=abs(tp-sl); size=0.0
         if dist>0: size=(equity*risk/dist)*fib_leverage(base,maxlev,sig["confidence"])
         jlog("signal.evaluated",side=sig["side"],confidence=round(sig["confidence"],4),
@@ -34,4 +58,18 @@ def main():
         if sig["confidence"]>=0.60 and size>0: broker.place_order(sig["side"],size,c,tp,sl)
         if (i%50)==0: jlog("account.snapshot",**broker.positions(),open_orders=len(broker.open_orders()))
     jlog("sandbox.done",**broker.positions())
+    return {**broker.positions(),"open_orders":len(broker.open_orders())}
+def main():
+    a=parse_args()
+    jlog("sandbox.start",symbol=a.symbol,run=os.getenv("RUN_ID"))
+    if a.bin: stream=iter_bars(load_bin(a.bin))
+    elif a.csv: stream=load_csv(a.csv)
+    elif a.seed is not None:
+        from .synth import generate, as_stream
+        stream=as_stream(generate(a.steps,seed=a.seed))
+    else: stream=synthetic(a.steps)
+    pb=Playback(stream,a.speed,a.bar_seconds)
+    run(a.symbol,pb,params_from_env())
+    if a.speed>0: jlog("playback.done",bars=pb.count,speed=a.speed,max_lag_s=round(pb.max_lag,4))
+    flush()
 if __name__=="__main__": main()
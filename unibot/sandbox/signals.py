@@ -1,4 +1,5 @@
-from .mathlib import sma, zscore
+from collections import deque
+from .mathlib import sma, zscore, RollingSum, RollingMeanVar
 def detect_fvg(ohlc, lookback=50):
     n=len(ohlc); bull=bear=0.0; gap=0.0
     if n<3: return {"bull":0.0,"bear":0.0,"gap":0.0}
@@ -10,21 +11,63 @@ def detect_fvg(ohlc, lookback=50):
         if h<lo2: bear=1.0; gap=max(gap,lo2-h)
     return {"bull":bull,"bear":bear,"gap":gap}
 def momentum_weight(closes,fast,slow):
-    sf=sma(closes,fast); ss=sma(closes,slow)
+    return momentum_from(sma(closes,fast),sma(closes,slow))
+def momentum_from(sf,ss):
     if sf!=sf or ss!=ss: return 0.0
     base=0.0 if ss==0 else (sf-ss)/abs(ss)
     base=max(-0.02,min(0.02,base))
     return (base+0.02)/0.04
 def meanrev_weight(closes,p):
-    z=zscore(closes,p); z=max(-3.0,min(3.0,z))
+    return meanrev_from(zscore(closes,p))
+def meanrev_from(z):
+    z=max(-3.0,min(3.0,z))
     return min(1.0,abs(z)/3.0)
 def aggregate_signal(ohlc,w_fvg,w_mom,w_mr,fvg_lb,fast,slow,mr_p):
     closes=[c for _,_,_,c in ohlc]
-    fvgr=detect_fvg(ohlc,fvg_lb)
-    mom=momentum_weight(closes,fast,slow)
-    mr=meanrev_weight(closes,mr_p)
-    mom_dir=1.0 if (sma(closes,fast)>sma(closes,slow)) else -1.0
+    return combine_signal(detect_fvg(ohlc,fvg_lb),sma(closes,fast),sma(closes,slow),zscore(closes,mr_p),w_fvg,w_mom,w_mr)
+def combine_signal(fvgr,sf,ss,z,w_fvg,w_mom,w_mr):
+    """Blend precomputed FVG result, fast/slow SMA and mean-reversion z-score (same maths as aggregate_signal)."""
+    mom=momentum_from(sf,ss)
+    mr=meanrev_from(z)
+    mom_dir=1.0 if (sf>ss) else -1.0
     dir_score=(fvgr["bull"]-fvgr["bear"])+0.5*mom_dir
     side="LONG" if dir_score>=0 else "SHORT"
     conf=max(0.0,min(1.0, w_fvg*(fvgr["bull"] or fvgr["bear"])+w_mom*mom+w_mr*mr))
     return {"side":side,"confidence":conf,"fvg_gap":fvgr["gap"]}
+class FvgTracker:
+    """
+    Incremental detect_fvg: call update() once per new bar, read() returns the
+    same bull/bear/gap as detect_fvg(ohlc,lookback) over the bars seen so far.
+    Gaps older than `lookback` bars expire; gap max is a monotonic deque.
+    """
+    def __init__(self,lookback=50):
+        self.lb=int(lookback); self.n=0; self.prev=deque(maxlen=2)
+        self.bull=deque(); self.bear=deque(); self.gaps=deque()  # bar indices / (index,gap) decreasing
+    def update(self,o,h,l,c):
+        i=self.n; self.n+=1
+        if len(self.prev)==2:
+            _,hi2,lo2,_=self.prev[0]; g=0.0
+            if l>hi2: self.bull.append(i); g=l-hi2
+            if h<lo2: self.bear.append(i); g=max(g,lo2-h)
+            if g>0.0:
+                while self.gaps and self.gaps[-1][1]<=g: self.gaps.pop()
+                self.gaps.append((i,g))
+        self.prev.append((o,h,l,c))
+        lo=self.n-self.lb
+        for q in (self.bull,self.bear):
+            while q and q[0]<lo: q.popleft()
+        while self.gaps and self.gaps[0][0]<lo: self.gaps.popleft()
+        return self.read()
+    def read(self):
+        if self.n<3: return {"bull":0.0,"bear":0.0,"gap":0.0}
+        return {"bull":1.0 if self.bull else 0.0,"bear":1.0 if self.bear else 0.0,
+                "gap":self.gaps[0][1] if self.gaps else 0.0}
+class SignalAggregator:
+    """Stateful aggregate_signal: update() once per bar, O(1) in lookback and history."""
+    def __init__(self,w_fvg,w_mom,w_mr,fvg_lb,fast,slow,mr_p):
+        self.w=(w_fvg,w_mom,w_mr); self.fvg=FvgTracker(fvg_lb)
+        self.fast=RollingSum(fast); self.slow=RollingSum(slow); self.mr=RollingMeanVar(mr_p)
+    def update(self,o,h,l,c):
+        self.fvg.update(o,h,l,c); self.fast.update(c); self.slow.update(c); self.mr.update(c)
+    def signal(self):
+        return combine_signal(self.fvg.read(),self.fast.mean(),self.slow.mean(),self.mr.zscore(),*self.w)
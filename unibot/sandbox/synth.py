@@ -0,0 +1,106 @@
+"""
+UNIBOT Sandbox: seeded, NumPy-vectorised synthetic market generator.
+
+Bars come out as the binary feed layout (feed.bar_dtype) so they can be saved
+as .npy, replayed through feed.iter_bars, or streamed as dicts via as_stream().
+
+  python -m unibot.sandbox.synth --n 5000000 --seed 7 --out data/stress_EUR_USD.npy
+"""
+import time, argparse
+import numpy as np
+from .feed import bar_dtype, iter_bars
+
+def _ar1(e, phi):
+    """x_t = phi*x_{t-1} + e_t without a per-element Python loop (blocked closed form)."""
+    e=np.asarray(e, dtype=float); n=len(e)
+    if n==0 or phi<=1e-6: return e.copy()
+    B=int(max(1, min(1024, 150/-np.log10(phi)))) if phi<1 else 1024  # keep phi**-B finite
+    nb=-(-n//B); E=np.zeros(nb*B); E[:n]=e; E=E.reshape(nb, B)
+    k=np.arange(B, dtype=float); pw=phi**k
+    Y=pw*np.cumsum(E*phi**-k, axis=1)  # per-block solution with zero initial state
+    carry=np.empty(nb); c=0.0; pB=phi**B
+    for b in range(nb):  # one step per block, not per bar
+        carry[b]=c; c=pB*c+Y[b,-1]
+    return (Y+np.outer(carry, pw*phi)).ravel()[:n]
+
+def trading_times(n, bar_seconds=60, start="2024-01-01T00:00:00", weekend_gaps=True):
+    """n bar timestamps (epoch ms) plus a mask of bars that open after a skipped weekend."""
+    t0=np.datetime64(start, "s").astype(np.int64)
+    if not weekend_gaps:
+        return (t0+np.arange(n, dtype=np.int64)*bar_seconds)*1000, np.zeros(n, dtype=bool)
+    m=int(n*7/5)+int(3*86400/bar_seconds)+16
+    while True:
+        t=t0+np.arange(m, dtype=np.int64)*bar_seconds
+        dow=((t//86400)+3)%7; hour=(t%86400)//3600  # 0=Mon .. 6=Sun
+        closed=((dow==4)&(hour>=21))|(dow==5)|((dow==6)&(hour<21))  # FX: Fri 21:00 -> Sun 21:00 UTC
+        keep=np.flatnonzero(~closed)
+        if len(keep)>=n: break
+        m*=2
+    keep=keep[:n]; gap=np.zeros(n, dtype=bool); gap[1:]=np.diff(keep)>1
+    return t[keep]*1000, gap
+
+def generate(n, seed=None, start=1.10000, vol=0.0005, model="garch",
+             vol_persist=0.985, vol_of_vol=0.35, jump_prob=0.0005, jump_sd=0.004,
+             regimes=True, trend_len=600, range_len=900, trend_drift=0.05, range_revert=0.35,
+             bar_seconds=60, start_ts="2024-01-01T00:00:00", weekend_gaps=True, weekend_vol=0.002):
+    """
+    n OHLC bars as a bar_dtype structured array.
+      model        "gbm" (constant vol) or "garch" (clustered vol: log-vol AR(1),
+                   persistence vol_persist, stationary sd vol_of_vol)
+      jumps        Bernoulli(jump_prob) x N(0, jump_sd) log-return shocks
+      regimes      alternating trend / range spells (geometric lengths, means
+                   trend_len / range_len). Trend adds a signed drift of
+                   trend_drift*sigma per bar; range makes returns MA(1) with -range_revert.
+      weekend gaps bars skip Fri 21:00 -> Sun 21:00 UTC and the first bar after
+                   gaps open by N(0, weekend_vol)
+    """
+    rng=np.random.default_rng(seed)
+    ts, gapmask=trading_times(n, bar_seconds, start_ts, weekend_gaps)
+    if model=="gbm": sigma=np.full(n, vol)
+    elif model=="garch":
+        h=_ar1(rng.standard_normal(n)*vol_of_vol*np.sqrt(1-vol_persist**2), vol_persist)
+        sigma=vol*np.exp(h-vol_of_vol**2/2)  # E[sigma] ~= vol
+    else: raise ValueError(f"unknown model {model!r} (gbm|garch)")
+    z=rng.standard_normal(n)*sigma; r=z.copy()
+    if regimes and n:
+        k=n//max(1, min(trend_len, range_len))+2
+        lens=np.where(np.arange(k)%2==0, rng.geometric(1/trend_len, k), rng.geometric(1/range_len, k))
+        seg=np.minimum(np.searchsorted(np.cumsum(lens), np.arange(n), side="right"), k-1)
+        trend=(seg%2==0); sign=rng.choice((-1.0, 1.0), k)[seg]
+        r+=np.where(trend, sign*trend_drift*sigma, 0.0)
+        zp=np.concatenate(([0.0], z[:-1]))
+        r-=np.where(~trend, range_revert*zp, 0.0)
+    if jump_prob>0: r+=(rng.random(n)<jump_prob)*rng.normal(0.0, jump_sd, n)
+    g=np.where(gapmask, rng.normal(0.0, weekend_vol, n), 0.0)
+    lc=np.log(start)+np.cumsum(g+r)
+    lo=np.concatenate(([np.log(start)], lc[:-1]))+g
+    o=np.exp(lo); c=np.exp(lc)
+    out=np.empty(n, dtype=bar_dtype())
+    out["ts"]=ts; out["o"]=o; out["c"]=c
+    out["h"]=np.maximum(o, c)*np.exp(np.abs(rng.standard_normal(n))*sigma/2)
+    out["l"]=np.minimum(o, c)*np.exp(-np.abs(rng.standard_normal(n))*sigma/2)
+    return out
+
+def as_stream(bars):
+    """Same {"ts","o","h","l","c"} dicts as feed.synthetic(), for the runner."""
+    return iter_bars(bars)
+
+def main():
+    p=argparse.ArgumentParser()
+    p.add_argument("--n", type=int, default=1_000_000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--model", default="garch", choices=("gbm","garch"))
+    p.add_argument("--start", type=float, default=1.10000)
+    p.add_argument("--vol", type=float, default=0.0005)
+    p.add_argument("--bar-seconds", type=int, default=60)
+    p.add_argument("--no-regimes", action="store_true")
+    p.add_argument("--no-weekends", action="store_true")
+    p.add_argument("--out", required=True, help=".npy output (feed.load_bin / runner --bin)")
+    a=p.parse_args()
+    t=time.perf_counter()
+    bars=generate(a.n, seed=a.seed, start=a.start, vol=a.vol, model=a.model, bar_seconds=a.bar_seconds,
+                  regimes=not a.no_regimes, weekend_gaps=not a.no_weekends)
+    dt=time.perf_counter()-t; np.save(a.out, bars)
+    print(f"{a.n} bars in {dt:.2f}s ({a.n/max(dt,1e-9):,.0f} bars/s) -> {a.out}")
+
+if __name__=="__main__": main()